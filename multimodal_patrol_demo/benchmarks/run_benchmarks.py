@@ -0,0 +1,308 @@
+"""Micro and end-to-end benchmarks on a synthetic sequence.
+
+Results are written as JSON keyed by case name, so two runs can be compared:
+
+    python benchmarks/run_benchmarks.py --output output/bench_base.json
+    python benchmarks/run_benchmarks.py --baseline output/bench_base.json
+
+With ``--baseline`` the run exits non-zero when a case's median got slower
+than the baseline by more than ``--tolerance``.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from demo.config import AppConfig, ZoneConfig, load_config  # noqa: E402
+from demo.data_simulator import DataSimulator  # noqa: E402
+from demo.fusion.fusion_engine import FusionEngine  # noqa: E402
+from demo.fusion.zone_logic import ZoneMonitor  # noqa: E402
+from demo.types import DetectionResult, PointCloudFrame, Target3D  # noqa: E402
+from demo.ui.opencv_ui import RGBView  # noqa: E402
+from run_demo import run  # noqa: E402
+from scripts.generate_synthetic_sequence import generate_sequence  # noqa: E402
+
+CLASS_NAMES = ("person", "bicycle", "car")
+
+
+def time_call(fn: Callable[[int], object], repeat: int, warmup: int = 2) -> Dict[str, float]:
+    """Calls ``fn(i)`` ``repeat`` times after ``warmup`` untimed calls and summarises the latencies."""
+    for i in range(warmup):
+        fn(i)
+    samples = np.empty(repeat, dtype=np.float64)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples[i] = (time.perf_counter() - start) * 1000.0
+    return {
+        "n": repeat,
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "min_ms": float(samples.min()),
+    }
+
+
+def random_detections(
+    rng: np.random.Generator, count: int, image_shape, timestamp: float = 0.0
+) -> DetectionResult:
+    h, w = image_shape
+    xy = rng.uniform((0, 0), (w * 0.9, h * 0.7), (count, 2))
+    wh = rng.uniform((20, 40), (w * 0.1, h * 0.3), (count, 2))
+    return DetectionResult(
+        boxes=np.hstack([xy, np.minimum(xy + wh, (w - 1, h - 1))]),
+        scores=rng.uniform(0.3, 1.0, count),
+        class_ids=rng.integers(0, len(CLASS_NAMES), count),
+        class_names=CLASS_NAMES,
+        timestamp=timestamp,
+    )
+
+
+def bench_get_frame(config: AppConfig, repeat: int) -> Dict[str, Dict]:
+    results = {}
+    variants = {"files": config.demo}
+    packed = Path(config.demo.sequence_root) / "packed"
+    if packed.exists():
+        variants["packed"] = replace(config.demo, packed_dir=str(packed))
+    for name, demo_config in variants.items():
+        # No cache or prefetch: every call is a cold read and decode.
+        simulator = DataSimulator(replace(demo_config, prefetch_depth=0, cache_size_bytes=0))
+        results[f"data.get_frame[{name}]"] = time_call(
+            lambda i: simulator.get_frame(i % len(simulator)), repeat
+        )
+        simulator.close()
+    return results
+
+
+def bench_fuse(config: AppConfig, repeat: int, det_counts: List[int], point_counts: List[int]) -> Dict[str, Dict]:
+    results = {}
+    rng = np.random.default_rng(0)
+    image_shape = (375, 1242)
+    for projection in (False, True):
+        engine = FusionEngine(replace(config.fusion, use_projection=projection))
+        mode = "calibrated" if projection else "virtual_camera"
+        for num_points in point_counts:
+            pcd = PointCloudFrame(
+                points=rng.uniform((0, -20, -2), (40, 20, 2), (num_points, 3)).astype(np.float32),
+                timestamp=0.0,
+            )
+            for num_dets in det_counts:
+                det = random_detections(rng, num_dets, image_shape)
+                results[f"fusion.fuse[{mode},points={num_points},dets={num_dets}]"] = time_call(
+                    lambda i: engine.fuse(det, pcd, image_shape), repeat
+                )
+    return results
+
+
+def bench_zone_monitor(repeat: int, target_counts: List[int]) -> Dict[str, Dict]:
+    results = {}
+    rng = np.random.default_rng(0)
+    zone_names = [f"zone_{k}" for k in range(4)]
+    for num_targets in target_counts:
+        monitor = ZoneMonitor(stay_time_threshold_s=1.0, track_timeout_s=1.0)
+        targets = [
+            Target3D(
+                class_name="person",
+                distance_m=5.0,
+                in_danger_zone=True,
+                bbox_xyxy=np.zeros(4, dtype=np.float32),
+                timestamp=0.0,
+                track_id=k,
+                zones=[str(z) for z in rng.choice(zone_names, size=rng.integers(0, 3), replace=False)],
+            )
+            for k in range(num_targets)
+        ]
+        results[f"zone.update[targets={num_targets}]"] = time_call(
+            lambda i: monitor.update(targets, i * 0.1), repeat
+        )
+    return results
+
+
+def bench_rgb_render(config: AppConfig, repeat: int, det_counts: List[int]) -> Dict[str, Dict]:
+    results = {}
+    rng = np.random.default_rng(0)
+    simulator = DataSimulator(config.demo)
+    rgb, _ = simulator.get_frame(0)
+    simulator.close()
+    view = RGBView(config, offscreen=True)
+    image_shape = rgb.image.shape[:2]
+    for num_dets in det_counts:
+        det = random_detections(rng, num_dets, image_shape)
+        targets = [
+            Target3D(
+                class_name=label,
+                distance_m=5.0,
+                in_danger_zone=bool(k % 2),
+                bbox_xyxy=box,
+                timestamp=0.0,
+            )
+            for k, (box, label) in enumerate(zip(det.boxes, det.labels()))
+        ]
+        results[f"ui.rgb_render[dets={num_dets}]"] = time_call(
+            lambda i: view.render(rgb, det, targets, alert=True, event_text="bench event text"), repeat
+        )
+    return results
+
+
+def bench_pipeline(config: AppConfig, runs: int, workdir: Path) -> Dict[str, Dict]:
+    """``run_demo.py --headless`` with the dummy backend: the pipeline, narrator, summarizer and event store main() builds."""
+    run_config = replace(
+        config,
+        llm=replace(config.llm, enabled=False, cache_enabled=False),
+        event_store=replace(config.event_store, path=str(workdir / "events")),
+        recorder=replace(config.recorder, enabled=False),
+        metrics=replace(config.metrics, enabled=False),
+    )
+    fps, wall = [], []
+    for _ in range(runs):
+        # run() prints its usual per-run statistics; keep them out of the benchmark output.
+        with contextlib.redirect_stdout(io.StringIO()):
+            frames, wall_s = run(run_config, headless=True)
+        fps.append(frames / wall_s if wall_s > 0 else 0.0)
+        wall.append(wall_s * 1000.0)
+    return {
+        "pipeline.headless": {
+            "n": runs,
+            "frames": frames,
+            "mean_ms": float(np.mean(wall)),
+            "p50_ms": float(np.median(wall)),
+            "min_ms": float(np.min(wall)),
+            "fps": float(np.median(fps)),
+        }
+    }
+
+
+def build_config(base_config: Path, sequence_root: Path) -> AppConfig:
+    config = load_config(base_config)
+    demo = replace(
+        config.demo,
+        sequence_root=str(sequence_root),
+        rgb_dir=str(sequence_root / "rgb"),
+        pointcloud_dir=str(sequence_root / "pointcloud"),
+        timestamps_file=str(sequence_root / "timestamps.txt"),
+        packed_dir="",
+    )
+    fusion = replace(
+        config.fusion,
+        calib_file=str(sequence_root / "calib.txt"),
+        max_distance_m=40.0,
+        zones=config.fusion.zones
+        or [ZoneConfig(name="danger_zone", polygon=[[0.3, 0.5], [0.7, 0.5], [0.7, 1.0], [0.3, 1.0]])],
+    )
+    model = replace(config.model, backend="ascend", batch_size=1)
+    return replace(config, demo=demo, fusion=fusion, model=model)
+
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=False
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Prints a side-by-side table and returns the cases whose median regressed past ``tolerance``."""
+    regressions = []
+    print(f"{'case':60s} {'base p50':>10s} {'new p50':>10s} {'change':>8s}")
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get("p50_ms"):
+            print(f"{name:60s} {'-':>10s} {stats['p50_ms']:10.3f} {'new':>8s}")
+            continue
+        change = stats["p50_ms"] / base["p50_ms"] - 1.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:60s} {base['p50_ms']:10.3f} {stats['p50_ms']:10.3f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the patrol demo on a synthetic sequence.")
+    parser.add_argument("--config", type=Path, default=ROOT / "config.yaml", help="Base config to derive from")
+    parser.add_argument("--data", type=Path, default=None, help="Existing synthetic sequence (generated if omitted)")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--points", type=int, default=120_000)
+    parser.add_argument("--repeat", type=int, default=30, help="Timed calls per micro-benchmark case")
+    parser.add_argument("--pipeline_runs", type=int, default=3)
+    parser.add_argument(
+        "--only",
+        nargs="*",
+        choices=["get_frame", "fuse", "zone", "render", "pipeline"],
+        help="Run a subset of the suites",
+    )
+    parser.add_argument("--output", type=Path, default=ROOT / "output" / "benchmarks.json")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative p50 slowdown")
+    args = parser.parse_args()
+
+    suites = set(args.only or ["get_frame", "fuse", "zone", "render", "pipeline"])
+    tmp = tempfile.TemporaryDirectory(prefix="patrol_bench_")
+    data = args.data
+    if data is None:
+        data = generate_sequence(Path(tmp.name), num_frames=args.frames, num_points=args.points, packed=True)
+    config = build_config(args.config, data)
+
+    results: Dict[str, Dict] = {}
+    try:
+        if "get_frame" in suites:
+            results.update(bench_get_frame(config, args.repeat))
+        if "fuse" in suites:
+            results.update(bench_fuse(config, args.repeat, [1, 10, 50], [30_000, args.points]))
+        if "zone" in suites:
+            results.update(bench_zone_monitor(args.repeat, [10, 100]))
+        if "render" in suites:
+            results.update(bench_rgb_render(config, args.repeat, [0, 20]))
+        if "pipeline" in suites:
+            results.update(bench_pipeline(config, args.pipeline_runs, Path(tmp.name)))
+    finally:
+        tmp.cleanup()
+
+    for name, stats in results.items():
+        print(f"{name:60s} p50 {stats['p50_ms']:9.3f} ms  mean {stats['mean_ms']:9.3f} ms")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "environment": environment(),
+        "params": {"frames": args.frames, "points": args.points, "repeat": args.repeat},
+        "results": results,
+    }
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
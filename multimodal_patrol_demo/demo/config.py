@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import yaml
 
@@ -12,6 +12,17 @@ class DemoConfig:
     pointcloud_dir: str
     timestamps_file: str
     play_fps: int
+    prefetch_depth: int = 0
+    prefetch_workers: int = 2
+    cache_size_bytes: int = 0
+    packed_dir: str = ""
+    # "timestamps": replay at the recorded timestamps; "fps": at a fixed play_fps (0 = unthrottled).
+    pacing: str = "timestamps"
+    playback_speed: float = 1.0
+    # What to do with frames more than max_lag_s late: "none" (show late), "drop" (don't show),
+    # "skip" (don't show, and don't load frames that are already stale).
+    drop_policy: str = "drop"
+    max_lag_s: float = 0.1
 
 
 @dataclass
@@ -20,6 +31,12 @@ class ModelConfig:
     weights_path: str
     input_size: List[int]
     use_gpu: bool = True
+    batch_size: int = 1
+    max_batch_wait_ms: float = 10.0
+    num_threads: int = 0
+    conf_threshold: float = 0.25
+    iou_threshold: float = 0.45
+    max_detections: int = 300
 
 
 @dataclass
@@ -30,17 +47,53 @@ class DangerZoneConfig:
     y_max: float
 
 
+@dataclass
+class ZoneConfig:
+    name: str
+    # Normalized (x, y) image coordinates of the polygon vertices.
+    polygon: List[List[float]]
+    stay_time_threshold_s: Optional[float] = None
+
+
 @dataclass
 class FusionConfig:
     use_projection: bool
-    danger_zone: DangerZoneConfig
+    danger_zone: Optional[DangerZoneConfig]
     min_distance_m: float
     max_distance_m: float
+    calib_file: str = ""
+    zones: List[ZoneConfig] = field(default_factory=list)
+    zone_membership: str = "center"
+    footprint_min_overlap: float = 0.5
+    # Horizontal field of view of the assumed camera when use_projection is false.
+    camera_hfov_deg: float = 80.0
+
+
+@dataclass
+class PreprocessConfig:
+    enabled: bool = False
+    crop_range: bool = False
+    crop_min_distance_m: float = 0.0
+    crop_max_distance_m: float = 0.0
+    voxel_size_m: float = 0.0
+    remove_ground: bool = False
+    ground_distance_m: float = 0.2
+    ground_ransac_iterations: int = 32
+    ground_sample_size: int = 2048
+    ground_max_slope_deg: float = 15.0
+
+
+@dataclass
+class TrackerConfig:
+    iou_threshold: float = 0.3
+    # Seconds (of frame timestamps) a track may go unmatched before it is dropped.
+    max_age_s: float = 0.5
 
 
 @dataclass
 class AlertConfig:
     stay_time_threshold_s: float
+    track_timeout_s: float = 1.0
 
 
 @dataclass
@@ -49,6 +102,11 @@ class UIConfig:
     window_name_pcd: str
     font_scale: float
     line_thickness: int
+    headless: bool = False
+    display_scale: float = 1.0
+    pcd_max_fps: float = 10.0
+    pcd_max_points: int = 60000
+    pcd_threaded: bool = True
 
 
 @dataclass
@@ -59,6 +117,82 @@ class LLMConfig:
     api_base: str
     api_key_env: str
     timeout_s: int
+    # Alerts waiting for background narration; further alerts keep their template text.
+    narration_queue_size: int = 16
+    # Queued alerts narrated together in one chat completion.
+    narration_batch_size: int = 4
+    # HTTP transport: keep-alive pool size and retries with exponential backoff on 429/5xx.
+    pool_size: int = 4
+    max_retries: int = 2
+    retry_backoff_s: float = 0.5
+    # Streaming patrol summary: events per window / window length, and summaries merged per reduce step.
+    summary_window_events: int = 50
+    summary_window_s: float = 600.0
+    summary_fanout: int = 4
+    # Persistent SQLite response cache, bounded by entry count and by stored reply bytes (0 = no limit);
+    # cache_numeric_bucket > 0 rounds prompt numbers to that step when keying.
+    cache_enabled: bool = False
+    cache_path: str = "output/llm_cache.sqlite"
+    cache_ttl_s: float = 604800.0
+    cache_max_entries: int = 10000
+    cache_max_bytes: int = 0
+    cache_numeric_bucket: float = 0.0
+
+
+@dataclass
+class PipelineConfig:
+    queue_size: int = 4
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = False
+    # "jsonl": append one JSON snapshot per interval; "prometheus": rewrite a text-format file.
+    format: str = "jsonl"
+    path: str = "output/metrics.jsonl"
+    interval_s: float = 5.0
+
+
+@dataclass
+class EventStoreConfig:
+    enabled: bool = True
+    path: str = "output/events"
+    # Also store the frame's Target3D list with every event.
+    store_targets: bool = False
+    segment_max_events: int = 100000
+    batch_size: int = 256
+    flush_interval_s: float = 1.0
+    # Events waiting for the writer; beyond this they are dropped instead of stalling the pipeline.
+    queue_size: int = 10000
+
+
+@dataclass
+class RecorderConfig:
+    enabled: bool = False
+    path: str = "output/recordings"
+    # 0 = demo.play_fps.
+    fps: float = 0.0
+    segment_s: float = 300.0
+    codec: str = "mp4v"
+    queue_size: int = 32
+    pre_event_frames: int = 10
+    snapshot_quality: int = 90
+    record_video: bool = True
+
+
+@dataclass
+class StreamConfig:
+    name: str
+    demo: DemoConfig
+
+
+@dataclass
+class MultiStreamConfig:
+    # 0 = one worker process per stream, capped at the CPU count.
+    workers: int = 0
+    # "replicated": every worker loads its own backend; "central": the parent
+    # process runs one backend and micro-batches frames from all streams.
+    inference: str = "replicated"
 
 
 @dataclass
@@ -66,9 +200,17 @@ class AppConfig:
     demo: DemoConfig
     model: ModelConfig
     fusion: FusionConfig
+    preprocess: PreprocessConfig
+    tracker: TrackerConfig
     alert: AlertConfig
     ui: UIConfig
     llm: LLMConfig
+    pipeline: PipelineConfig
+    metrics: MetricsConfig
+    event_store: EventStoreConfig
+    recorder: RecorderConfig
+    streams: List[StreamConfig]
+    multistream: MultiStreamConfig
 
 
 class ConfigLoader:
@@ -78,19 +220,48 @@ class ConfigLoader:
     def load(self) -> AppConfig:
         with self.path.open("r", encoding="utf-8") as f:
             cfg_dict = yaml.safe_load(f)
-        danger_zone_cfg = DangerZoneConfig(**cfg_dict["fusion"]["danger_zone"])
+        fusion_dict = cfg_dict["fusion"]
+        danger_zone_cfg = (
+            DangerZoneConfig(**fusion_dict["danger_zone"]) if fusion_dict.get("danger_zone") else None
+        )
+        zones = [ZoneConfig(**z) for z in fusion_dict.get("zones") or []]
+        if not zones and danger_zone_cfg is not None:
+            # Legacy single axis-aligned box.
+            dz = danger_zone_cfg
+            zones = [
+                ZoneConfig(
+                    name="danger_zone",
+                    polygon=[[dz.x_min, dz.y_min], [dz.x_max, dz.y_min], [dz.x_max, dz.y_max], [dz.x_min, dz.y_max]],
+                )
+            ]
         return AppConfig(
             demo=DemoConfig(**cfg_dict["demo"]),
             model=ModelConfig(**cfg_dict["model"]),
             fusion=FusionConfig(
                 danger_zone=danger_zone_cfg,
-                use_projection=cfg_dict["fusion"].get("use_projection", False),
-                min_distance_m=cfg_dict["fusion"].get("min_distance_m", 0.0),
-                max_distance_m=cfg_dict["fusion"].get("max_distance_m", 0.0),
+                use_projection=fusion_dict.get("use_projection", False),
+                min_distance_m=fusion_dict.get("min_distance_m", 0.0),
+                max_distance_m=fusion_dict.get("max_distance_m", 0.0),
+                calib_file=fusion_dict.get("calib_file", ""),
+                zones=zones,
+                zone_membership=fusion_dict.get("zone_membership", "center"),
+                footprint_min_overlap=fusion_dict.get("footprint_min_overlap", 0.5),
+                camera_hfov_deg=fusion_dict.get("camera_hfov_deg", 80.0),
             ),
+            preprocess=PreprocessConfig(**cfg_dict.get("preprocess", {})),
+            tracker=TrackerConfig(**cfg_dict.get("tracker", {})),
             alert=AlertConfig(**cfg_dict["alert"]),
             ui=UIConfig(**cfg_dict["ui"]),
             llm=LLMConfig(**cfg_dict.get("llm", {})),
+            pipeline=PipelineConfig(**cfg_dict.get("pipeline", {})),
+            metrics=MetricsConfig(**cfg_dict.get("metrics", {})),
+            event_store=EventStoreConfig(**cfg_dict.get("event_store", {})),
+            recorder=RecorderConfig(**cfg_dict.get("recorder", {})),
+            streams=[
+                StreamConfig(name=s["name"], demo=DemoConfig(**{k: v for k, v in s.items() if k != "name"}))
+                for s in cfg_dict.get("streams") or []
+            ],
+            multistream=MultiStreamConfig(**cfg_dict.get("multistream", {})),
         )
 
 
@@ -1,10 +1,15 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, Iterable, List, Tuple
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
 
 import cv2
 import numpy as np
 import open3d as o3d
 
+from demo.frame_cache import FrameCache
+from demo.metrics import metrics
+from demo.packed_sequence import PackedSequence
 from demo.types import PointCloudFrame, RGBFrame
 
 
@@ -13,11 +18,34 @@ class DataSimulator:
         self.rgb_dir = Path(config.rgb_dir)
         self.pointcloud_dir = Path(config.pointcloud_dir)
         self.timestamps_file = Path(config.timestamps_file)
-        self.timestamps = self._load_timestamps()
+        packed_dir = getattr(config, "packed_dir", "")
+        self.packed: Optional[PackedSequence] = PackedSequence(packed_dir) if packed_dir else None
+        if self.packed is not None:
+            self.timestamps = self.packed.timestamps.tolist()
+            self.pcd_files: List[Path] = []
+        else:
+            self.timestamps = self._load_timestamps()
+            self.pcd_files = self._gather_files(self.pointcloud_dir)
         self.rgb_files = self._gather_files(self.rgb_dir)
-        self.pcd_files = self._gather_files(self.pointcloud_dir)
         self._validate_alignment()
 
+        self.prefetch_depth = max(0, getattr(config, "prefetch_depth", 0))
+        cache_size_bytes = getattr(config, "cache_size_bytes", 0)
+        self._cache: Optional[FrameCache] = (
+            FrameCache(cache_size_bytes) if cache_size_bytes > 0 else None
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.prefetch_depth > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, getattr(config, "prefetch_workers", 2)),
+                thread_name_prefix="prefetch",
+            )
+        self._pending: Dict[int, Future] = {}
+        self._stats_lock = threading.Lock()
+        self._cache_hits = 0
+        self._prefetch_hits = 0
+        self._misses = 0
+
     def __len__(self) -> int:
         return len(self.timestamps)
 
@@ -33,14 +61,16 @@ class DataSimulator:
         return sorted(p for p in directory.iterdir() if p.is_file())
 
     def _validate_alignment(self) -> None:
-        if not (len(self.rgb_files) == len(self.pcd_files) == len(self.timestamps)):
+        num_pcd = len(self.packed) if self.packed is not None else len(self.pcd_files)
+        if not (len(self.rgb_files) == num_pcd == len(self.timestamps)):
             raise ValueError(
                 "Mismatch between RGB frames, point clouds, and timestamps."
-                f" RGB: {len(self.rgb_files)}, PCD: {len(self.pcd_files)}, TS: {len(self.timestamps)}"
+                f" RGB: {len(self.rgb_files)}, PCD: {num_pcd}, TS: {len(self.timestamps)}"
             )
 
     def _read_rgb(self, path: Path) -> np.ndarray:
-        img = cv2.imread(str(path))
+        with metrics.timer("data.read_rgb"):
+            img = cv2.imread(str(path))
         if img is None:
             raise ValueError(f"Failed to read image: {path}")
         return img
@@ -50,23 +80,92 @@ class DataSimulator:
             pcd = o3d.io.read_point_cloud(str(path))
             return np.asarray(pcd.points, dtype=np.float32)
         if path.suffix.lower() == ".bin":
-            raw = np.fromfile(path, dtype=np.float32)
-            points = raw.reshape(-1, 4)[:, :3]
-            return points.astype(np.float32)
+            # Strided xyz view over the single buffer read from disk; no extra copy.
+            return np.fromfile(path, dtype=np.float32).reshape(-1, 4)[:, :3]
         raise ValueError(f"Unsupported point cloud format: {path.suffix}")
 
-    def get_frame(self, index: int) -> Tuple[RGBFrame, PointCloudFrame]:
-        if index < 0 or index >= len(self):
-            raise IndexError("Frame index out of range")
+    def _load_frame(self, index: int) -> Tuple[RGBFrame, PointCloudFrame]:
         timestamp = self.timestamps[index]
         rgb = RGBFrame(image=self._read_rgb(self.rgb_files[index]), timestamp=timestamp)
-        pcd = PointCloudFrame(points=self._read_pointcloud(self.pcd_files[index]), timestamp=timestamp)
+        if self.packed is not None:
+            points = self.packed.points_at(index)
+        else:
+            with metrics.timer("data.read_pointcloud"):
+                points = self._read_pointcloud(self.pcd_files[index])
+        pcd = PointCloudFrame(points=points, timestamp=timestamp)
         return rgb, pcd
 
-    def iter_frames(self) -> Iterable[Tuple[RGBFrame, PointCloudFrame]]:
-        for i in range(len(self)):
-            yield self.get_frame(i)
+    def _count(self, cache_hit: bool = False, prefetch_hit: bool = False) -> None:
+        with self._stats_lock:
+            if cache_hit:
+                self._cache_hits += 1
+            elif prefetch_hit:
+                self._prefetch_hits += 1
+            else:
+                self._misses += 1
+        metrics.inc("data.cache_hits" if cache_hit else "data.prefetch_hits" if prefetch_hit else "data.misses")
+
+    def prefetch(self, start: int) -> None:
+        """Schedules decoding of frames [start, start + prefetch_depth) on the thread pool."""
+        if self._executor is None:
+            return
+        end = min(len(self), start + self.prefetch_depth)
+        # Drop read-ahead work that fell outside the window, e.g. after a seek.
+        for index in list(self._pending):
+            future = self._pending[index]
+            if not start <= index < end and (future.cancel() or future.done()):
+                del self._pending[index]
+        for index in range(max(0, start), end):
+            if index in self._pending or (self._cache is not None and index in self._cache):
+                continue
+            self._pending[index] = self._executor.submit(self._load_frame, index)
 
-    def iter_frames_generator(self) -> Generator[Tuple[RGBFrame, PointCloudFrame], None, None]:
-        for i in range(len(self)):
+    def get_frame(self, index: int) -> Tuple[RGBFrame, PointCloudFrame]:
+        if index < 0 or index >= len(self):
+            raise IndexError("Frame index out of range")
+        if self._cache is not None:
+            frame = self._cache.get(index)
+            if frame is not None:
+                self._count(cache_hit=True)
+                return frame
+        future = self._pending.pop(index, None)
+        if future is not None and not future.cancelled():
+            with metrics.timer("data.prefetch_wait"):
+                frame = future.result()
+            self._count(prefetch_hit=True)
+        else:
+            frame = self._load_frame(index)
+            self._count()
+        if self._cache is not None:
+            self._cache.put(index, frame)
+        return frame
+
+    def cache_stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            hits = self._cache_hits + self._prefetch_hits
+            total = hits + self._misses
+            return {
+                "cache_hits": self._cache_hits,
+                "prefetch_hits": self._prefetch_hits,
+                "misses": self._misses,
+                "hit_rate": hits / total if total else 0.0,
+                "miss_rate": self._misses / total if total else 0.0,
+                "cached_frames": len(self._cache) if self._cache is not None else 0,
+                "cached_bytes": self._cache.current_bytes if self._cache is not None else 0,
+            }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+
+    def iter_frames(self, start: int = 0) -> Iterable[Tuple[RGBFrame, PointCloudFrame]]:
+        for i in range(start, len(self)):
+            self.prefetch(i)
             yield self.get_frame(i)
+
+    def iter_frames_generator(
+        self, start: int = 0
+    ) -> Generator[Tuple[RGBFrame, PointCloudFrame], None, None]:
+        yield from self.iter_frames(start)
@@ -0,0 +1,473 @@
+"""Append-only, segmented on-disk store for alert events.
+
+Layout of the store directory:
+    manifest.json        segments, record counts and time bounds, plus the
+                         patrol/zone/class dictionaries used by the index
+    seg-000001.jsonl     one JSON record per event (optionally with Target3D snapshots)
+    seg-000001.idx       packed INDEX_DTYPE records, one per event, same order
+    seg-000001.notes.jsonl  narrations that arrived after their events were
+                         queued, as {"event_id", "extra_info"} records
+
+Queries filter the memory-mapped index (pruning whole segments by their
+time bounds first) and only parse the JSON lines that match.
+"""
+
+import json
+import os
+import queue
+import bisect
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from demo.metrics import metrics
+from demo.types import AlertEvent, Target3D
+
+MANIFEST_FILE = "manifest.json"
+INDEX_DTYPE = np.dtype(
+    [("ts", "<f8"), ("patrol", "<u2"), ("zone", "<u2"), ("cls", "<u2"), ("offset", "<u8")]
+)
+
+_STOP = object()
+
+
+def _segment_name(number: int) -> str:
+    return f"seg-{number:06d}"
+
+
+def _event_seq(event_id: str) -> int:
+    return int(event_id.rsplit("/", 1)[1])
+
+
+def _target_record(target: Target3D) -> dict:
+    record = asdict(target)
+    record["bbox_xyxy"] = [float(v) for v in np.asarray(target.bbox_xyxy).reshape(-1)]
+    return record
+
+
+class EventStore:
+    """Append-only event log with a timestamp/patrol/zone/class index.
+
+    ``append`` only enqueues; a background writer (``start``) appends batches
+    of up to ``batch_size`` records, or whatever arrived within
+    ``flush_interval_s``, then flushes and atomically rewrites the manifest,
+    so a crash loses at most the unflushed batch. If the writer falls
+    ``queue_size`` records behind, further events are dropped and counted
+    rather than blocking the caller. Every patrol starts its own segment
+    (rolling over after ``segment_max_events`` records), so timestamps,
+    which restart with each patrol, stay sorted within a segment.
+
+    Every appended event gets an ``event_id``; ``annotate`` attaches text
+    that is only known later (the LLM narration) to it, and queries return
+    the event with that text as ``extra_info``.
+
+    The query methods read only flushed data and can be used on a store that
+    another process is writing.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        patrol_id: str = "",
+        segment_max_events: int = 100_000,
+        batch_size: int = 256,
+        flush_interval_s: float = 1.0,
+        queue_size: int = 10_000,
+    ) -> None:
+        self.root = Path(root)
+        self.patrol_id = patrol_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.segment_max_events = max(1, segment_max_events)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+        self.written = 0
+        self.dropped = 0
+        self._next_seq = 0
+        # (first event seq, segment name) for the segments this store has written to.
+        self._segment_starts: List[Tuple[int, str]] = []
+
+    def _load_manifest(self) -> dict:
+        path = self.root / MANIFEST_FILE
+        if not path.exists():
+            return {"version": 1, "segments": [], "patrols": [], "zones": [], "classes": []}
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        segments = manifest["segments"]
+        # Index records are written after their JSON lines, so the .idx files are the
+        # source of truth if the process died before the manifest was updated.
+        number = int(segments[-1]["name"].split("-")[1]) if segments else 1
+        if not segments and (self.root / f"{_segment_name(number)}.idx").exists():
+            segments.append({"name": _segment_name(number), "count": 0})
+        while (self.root / f"{_segment_name(number + 1)}.idx").exists():
+            number += 1
+            segments.append({"name": _segment_name(number), "count": 0})
+        for segment in segments[-2:]:
+            idx_path = self.root / f"{segment['name']}.idx"
+            count = idx_path.stat().st_size // INDEX_DTYPE.itemsize if idx_path.exists() else 0
+            if count != segment["count"] or "sorted" not in segment:
+                ts = np.fromfile(idx_path, dtype=INDEX_DTYPE, count=count)["ts"] if count else np.zeros(0)
+                segment["count"] = count
+                segment["min_ts"] = float(ts.min()) if count else None
+                segment["max_ts"] = float(ts.max()) if count else None
+                segment["sorted"] = bool(count < 2 or np.all(np.diff(ts) >= 0))
+        return manifest
+
+    def _save_manifest(self) -> None:
+        path = self.root / MANIFEST_FILE
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self._manifest, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _id(self, table: str, name: Optional[str]) -> int:
+        names: List[str] = self._manifest[table]
+        name = name or ""
+        try:
+            return names.index(name)
+        except ValueError:
+            names.append(name)
+            return len(names) - 1
+
+    def _lookup_id(self, table: str, name: str) -> Optional[int]:
+        names: List[str] = self._manifest[table]
+        return names.index(name) if name in names else None
+
+    def _truncate_torn_tails(self) -> None:
+        """Cuts partial index records and unindexed log lines left by a crash, before appending.
+
+        Only the writer does this; readers just ignore the torn tail.
+        """
+        for segment in self._manifest["segments"][-2:]:
+            idx_path = self.root / f"{segment['name']}.idx"
+            log_path = self.root / f"{segment['name']}.jsonl"
+            count = segment["count"]
+            if idx_path.exists() and idx_path.stat().st_size != count * INDEX_DTYPE.itemsize:
+                os.truncate(idx_path, count * INDEX_DTYPE.itemsize)
+            if not log_path.exists():
+                continue
+            log_end = 0
+            if count:
+                offset = int(np.fromfile(idx_path, dtype=INDEX_DTYPE, count=count)["offset"][-1])
+                with log_path.open("rb") as log:
+                    log.seek(offset)
+                    log_end = offset + len(log.readline())
+            if log_path.stat().st_size != log_end:
+                os.truncate(log_path, log_end)
+            notes_path = self.root / f"{segment['name']}.notes.jsonl"
+            if notes_path.exists():
+                data = notes_path.read_bytes()
+                if data and not data.endswith(b"\n"):
+                    os.truncate(notes_path, data.rfind(b"\n") + 1)
+
+    def start(self) -> "EventStore":
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._truncate_torn_tails()
+        self._thread = threading.Thread(target=self._run, name="event-store-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def append(self, event: AlertEvent, targets: Optional[Sequence[Target3D]] = None) -> bool:
+        """Queues ``event`` (and optionally the frame's targets) for the background writer.
+
+        Returns ``False`` if it was dropped because the writer is too far behind.
+        """
+        with self._lock:
+            self._next_seq += 1
+            event.event_id = f"{self.patrol_id}/{self._next_seq}"
+        record = asdict(event)
+        record["patrol_id"] = self.patrol_id
+        if targets is not None:
+            record["targets"] = [_target_record(t) for t in targets]
+        if not self._put(record):
+            event.event_id = None
+            return False
+        return True
+
+    def annotate(self, event: AlertEvent, text: str) -> bool:
+        """Queues ``text`` as the ``extra_info`` of an event this store already accepted."""
+        if event.event_id is None or not event.event_id.startswith(self.patrol_id + "/"):
+            return False
+        return self._put((event.event_id, text))
+
+    def _put(self, item) -> bool:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            metrics.inc("event_store.dropped")
+            return False
+        metrics.set_gauge("queue.event_store", self._queue.qsize())
+        return True
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[dict] = []
+            deadline = time.monotonic() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                with metrics.timer("event_store.flush"):
+                    self._write_batch(batch)
+
+    def _open_segment(self) -> dict:
+        segments = self._manifest["segments"]
+        last = segments[-1] if segments else None
+        if last is not None and last.get("patrol") == self.patrol_id and last["count"] < self.segment_max_events:
+            return last
+        if last is not None and last["count"] == 0:
+            # Reuse an empty segment file, e.g. one recovered without its manifest entry.
+            last.update(patrol=self.patrol_id, min_ts=None, max_ts=None, sorted=True)
+            return last
+        number = int(last["name"].split("-")[1]) + 1 if last is not None else 1
+        segment = {
+            "name": _segment_name(number),
+            "patrol": self.patrol_id,
+            "count": 0,
+            "min_ts": None,
+            "max_ts": None,
+            "sorted": True,
+        }
+        segments.append(segment)
+        return segment
+
+    def _write_batch(self, items: list) -> None:
+        batch = [item for item in items if isinstance(item, dict)]
+        notes = [item for item in items if not isinstance(item, dict)]
+        with self._lock:
+            # Register new dictionary names before any index entry refers to them.
+            known = sum(len(self._manifest[t]) for t in ("patrols", "zones", "classes"))
+            for record in batch:
+                self._id("patrols", record["patrol_id"])
+                self._id("zones", record["zone_name"])
+                self._id("classes", record["class_name"])
+            if sum(len(self._manifest[t]) for t in ("patrols", "zones", "classes")) != known:
+                self._save_manifest()
+            if batch:
+                while batch:
+                    segment = self._open_segment()
+                    room = self.segment_max_events - segment["count"]
+                    chunk, batch = batch[:room], batch[room:]
+                    if not self._segment_starts or self._segment_starts[-1][1] != segment["name"]:
+                        self._segment_starts.append((_event_seq(chunk[0]["event_id"]), segment["name"]))
+                    self._append_to_segment(segment, chunk)
+                self._save_manifest()
+            if notes:
+                self._append_notes(notes)
+
+    def _append_notes(self, notes: List[Tuple[str, str]]) -> None:
+        # Each note goes next to its event, which was queued (so written) before it.
+        starts = [seq for seq, _ in self._segment_starts]
+        by_segment: Dict[str, List[bytes]] = {}
+        for event_id, text in notes:
+            pos = bisect.bisect_right(starts, _event_seq(event_id)) - 1
+            if pos < 0:
+                continue
+            line = json.dumps({"event_id": event_id, "extra_info": text}, ensure_ascii=False)
+            by_segment.setdefault(self._segment_starts[pos][1], []).append(line.encode("utf-8") + b"\n")
+        for name, lines in by_segment.items():
+            with (self.root / f"{name}.notes.jsonl").open("ab") as log:
+                log.write(b"".join(lines))
+                log.flush()
+                os.fsync(log.fileno())
+
+    def _append_to_segment(self, segment: dict, records: List[dict]) -> None:
+        index = np.zeros(len(records), dtype=INDEX_DTYPE)
+        with (self.root / f"{segment['name']}.jsonl").open("ab") as log:
+            for i, record in enumerate(records):
+                index[i] = (
+                    record["timestamp"],
+                    self._id("patrols", record["patrol_id"]),
+                    self._id("zones", record["zone_name"]),
+                    self._id("classes", record["class_name"]),
+                    log.tell(),
+                )
+                log.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            log.flush()
+            os.fsync(log.fileno())
+        with (self.root / f"{segment['name']}.idx").open("ab") as idx:
+            index.tofile(idx)
+            idx.flush()
+            os.fsync(idx.fileno())
+
+        ts = index["ts"]
+        last = segment["max_ts"]
+        segment["sorted"] = bool(
+            segment["sorted"] and (last is None or ts[0] >= last) and np.all(np.diff(ts) >= 0)
+        )
+        segment["min_ts"] = float(ts.min()) if segment["min_ts"] is None else min(segment["min_ts"], float(ts.min()))
+        segment["max_ts"] = float(ts.max()) if last is None else max(last, float(ts.max()))
+        segment["count"] += len(records)
+        self.written += len(records)
+
+    def close(self, timeout_s: float = 30.0) -> None:
+        """Writes everything still queued and stops the writer."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout_s)
+        self._thread = None
+
+    def refresh(self) -> None:
+        """Re-reads the manifest, picking up segments flushed by another writer."""
+        with self._lock:
+            self._manifest = self._load_manifest()
+
+    def _index(self, segment: dict) -> np.ndarray:
+        if segment["count"] == 0:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        return np.memmap(
+            self.root / f"{segment['name']}.idx", dtype=INDEX_DTYPE, mode="r", shape=(segment["count"],)
+        )
+
+    def _matches(
+        self,
+        start_ts: Optional[float],
+        end_ts: Optional[float],
+        zone: Optional[str],
+        class_name: Optional[str],
+        patrol_id: Optional[str],
+    ) -> Iterator[Tuple[dict, np.ndarray, np.ndarray]]:
+        """Yields (segment, index, positions of matching records) for every segment with matches."""
+        with self._lock:
+            segments = [dict(s) for s in self._manifest["segments"]]
+            ids = {}
+            for table, name in (("zones", zone), ("classes", class_name), ("patrols", patrol_id)):
+                if name is not None:
+                    ids[table] = self._lookup_id(table, name)
+                    if ids[table] is None:
+                        return
+        for segment in segments:
+            if segment["count"] == 0:
+                continue
+            if patrol_id is not None and segment.get("patrol", patrol_id) != patrol_id:
+                continue
+            if start_ts is not None and segment["max_ts"] < start_ts:
+                continue
+            if end_ts is not None and segment["min_ts"] > end_ts:
+                continue
+            index = self._index(segment)
+            lo, hi = 0, len(index)
+            if segment["sorted"]:
+                # Sorted timestamps: bisect instead of scanning the whole segment.
+                ts = index["ts"]
+                if start_ts is not None:
+                    lo = int(np.searchsorted(ts, start_ts, side="left"))
+                if end_ts is not None:
+                    hi = int(np.searchsorted(ts, end_ts, side="right"))
+                if lo >= hi:
+                    continue
+            part = index[lo:hi]
+            mask = np.ones(len(part), dtype=bool)
+            if not segment["sorted"]:
+                if start_ts is not None:
+                    mask &= part["ts"] >= start_ts
+                if end_ts is not None:
+                    mask &= part["ts"] <= end_ts
+            if "zones" in ids:
+                mask &= part["zone"] == ids["zones"]
+            if "classes" in ids:
+                mask &= part["cls"] == ids["classes"]
+            if "patrols" in ids:
+                mask &= part["patrol"] == ids["patrols"]
+            positions = np.flatnonzero(mask) + lo
+            if len(positions):
+                yield segment, index, positions
+
+    def count(
+        self,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+        zone: Optional[str] = None,
+        class_name: Optional[str] = None,
+        patrol_id: Optional[str] = None,
+    ) -> int:
+        """Number of matching events, answered from the index alone."""
+        return sum(len(p) for _, _, p in self._matches(start_ts, end_ts, zone, class_name, patrol_id))
+
+    def zone_counts(
+        self, start_ts: Optional[float] = None, end_ts: Optional[float] = None, patrol_id: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Events per zone over a time range, answered from the index alone."""
+        with self._lock:
+            zones: List[str] = list(self._manifest["zones"])
+        totals = np.zeros(len(zones), dtype=np.int64)
+        for _, index, positions in self._matches(start_ts, end_ts, None, None, patrol_id):
+            totals += np.bincount(index["zone"][positions], minlength=len(zones))[: len(zones)]
+        return {name: int(n) for name, n in zip(zones, totals) if n}
+
+    def query(
+        self,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+        zone: Optional[str] = None,
+        class_name: Optional[str] = None,
+        patrol_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        with_targets: bool = False,
+    ) -> Iterator[Tuple[AlertEvent, Optional[List[dict]]]]:
+        """Yields (event, target snapshots or None) for matching records, segment by segment."""
+        fields = set(AlertEvent.__dataclass_fields__)
+        returned = 0
+        for segment, index, positions in self._matches(start_ts, end_ts, zone, class_name, patrol_id):
+            notes = self._notes(segment)
+            with (self.root / f"{segment['name']}.jsonl").open("rb") as log:
+                for offset in index["offset"][positions].tolist():
+                    log.seek(offset)
+                    record = json.loads(log.readline())
+                    event = AlertEvent(**{k: v for k, v in record.items() if k in fields})
+                    event.extra_info = notes.get(event.event_id, event.extra_info)
+                    yield event, (record.get("targets") if with_targets else None)
+                    returned += 1
+                    if limit is not None and returned >= limit:
+                        return
+
+    def _notes(self, segment: dict) -> Dict[str, str]:
+        path = self.root / f"{segment['name']}.notes.jsonl"
+        notes: Dict[str, str] = {}
+        if not path.exists():
+            return notes
+        with path.open("rb") as log:
+            for line in log:
+                try:
+                    note = json.loads(line)
+                except ValueError:
+                    # Torn last line of a store that is still being written.
+                    continue
+                notes[note["event_id"]] = note["extra_info"]
+        return notes
+
+    def patrols(self) -> List[str]:
+        with self._lock:
+            return list(self._manifest["patrols"])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(s["count"] for s in self._manifest["segments"])
+
+
+def create_event_store(config) -> Optional[EventStore]:
+    if not config.enabled:
+        return None
+    return EventStore(
+        config.path,
+        segment_max_events=config.segment_max_events,
+        batch_size=config.batch_size,
+        flush_interval_s=config.flush_interval_s,
+        queue_size=config.queue_size,
+    ).start()
@@ -0,0 +1,73 @@
+import mmap
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from demo.types import PointCloudFrame, RGBFrame
+
+FramePair = Tuple[RGBFrame, PointCloudFrame]
+
+
+def resident_nbytes(array: np.ndarray) -> int:
+    """Bytes of RAM that keeping ``array`` alive pins.
+
+    A view pins its whole owning buffer (e.g. the (N, 4) scan behind a
+    ``[:, :3]`` slice); memory-mapped data is backed by the page cache and
+    counts as 0.
+    """
+    owner = array
+    while isinstance(owner.base, np.ndarray) and not isinstance(owner, np.memmap):
+        owner = owner.base
+    if isinstance(owner, np.memmap) or isinstance(owner.base, mmap.mmap):
+        return 0
+    return int(owner.nbytes)
+
+
+def frame_nbytes(frame: FramePair) -> int:
+    rgb, pcd = frame
+    return resident_nbytes(rgb.image) + resident_nbytes(pcd.points)
+
+
+class FrameCache:
+    """LRU cache of decoded frame pairs, bounded by a total byte budget."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[int, Tuple[FramePair, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._entries
+
+    def get(self, index: int) -> Optional[FramePair]:
+        with self._lock:
+            entry = self._entries.get(index)
+            if entry is None:
+                return None
+            self._entries.move_to_end(index)
+            return entry[0]
+
+    def put(self, index: int, frame: FramePair) -> None:
+        size = frame_nbytes(frame)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(index, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[index] = (frame, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
@@ -1,52 +1,126 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
+from demo.fusion.projection import KittiCalibration, project_to_image, virtual_camera_matrix
+from demo.fusion.zone_mask import ZoneMask
+from demo.metrics import metrics
 from demo.types import DetectionResult, PointCloudFrame, Target3D
 
 
+@dataclass
+class FramePoints:
+    # Projected points sorted by u, so a box's columns are one contiguous slice.
+    u: np.ndarray
+    v: np.ndarray
+    ranges: np.ndarray
+    in_range: np.ndarray
+
+
+def _partition_median(values: np.ndarray) -> float:
+    n = values.size
+    if n == 0:
+        return float("nan")
+    k = n // 2
+    if n % 2:
+        return float(np.partition(values, k)[k])
+    part = np.partition(values, (k - 1, k))
+    return float((part[k - 1] + part[k]) / 2.0)
+
+
 class FusionEngine:
     def __init__(self, config) -> None:
         self.config = config
+        self.zone_mask = ZoneMask(config.zones)
+        self.velo_to_image: Optional[np.ndarray] = None
+        if config.use_projection:
+            if not config.calib_file:
+                raise ValueError("fusion.use_projection requires fusion.calib_file")
+            self.velo_to_image = KittiCalibration.from_file(config.calib_file).velo_to_image()
+        self._virtual_cameras: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def zone_membership(self, boxes_xyxy: np.ndarray, image_shape) -> np.ndarray:
+        return self.zone_mask.membership(
+            boxes_xyxy,
+            image_shape,
+            mode=self.config.zone_membership,
+            min_overlap=self.config.footprint_min_overlap,
+        )
 
-    def _in_danger_zone(self, bbox_xyxy: np.ndarray, image_shape) -> bool:
-        h, w = image_shape
-        x1, y1, x2, y2 = bbox_xyxy
-        cx = (x1 + x2) / 2.0 / w
-        cy = (y1 + y2) / 2.0 / h
-        dz = self.config.danger_zone
-        return dz.x_min <= cx <= dz.x_max and dz.y_min <= cy <= dz.y_max
-
-    def _estimate_distance(self, points: np.ndarray) -> float:
-        if points.size == 0:
-            return float("nan")
-        radii = np.linalg.norm(points, axis=1)
-        radii = radii[~np.isnan(radii)]
-        if radii.size == 0:
-            return float("nan")
-        filtered = radii
+    def _projection_matrix(self, image_shape) -> np.ndarray:
+        if self.velo_to_image is not None:
+            return self.velo_to_image
+        # Without a calibration, assume a camera at the LiDAR looking forward with camera_hfov_deg.
+        key = (int(image_shape[0]), int(image_shape[1]))
+        matrix = self._virtual_cameras.get(key)
+        if matrix is None:
+            matrix = virtual_camera_matrix(key, self.config.camera_hfov_deg)
+            self._virtual_cameras[key] = matrix
+        return matrix
+
+    def prepare_frame(self, pcd: PointCloudFrame, image_shape) -> FramePoints:
+        """Computes every per-frame point quantity once, shared by all detections of the frame."""
+        projected = project_to_image(pcd.points, self._projection_matrix(image_shape), image_shape)
+        uv, ranges = projected.uv, projected.ranges
+        finite = np.isfinite(ranges)
+        if not finite.all():
+            ranges = ranges[finite]
+            uv = uv[finite]
+        order = np.argsort(uv[:, 0], kind="stable")
+        ranges = ranges[order]
+        in_range = np.ones(ranges.shape, dtype=bool)
         if self.config.min_distance_m > 0:
-            filtered = filtered[filtered >= self.config.min_distance_m]
+            in_range &= ranges >= self.config.min_distance_m
         if self.config.max_distance_m > 0:
-            filtered = filtered[filtered <= self.config.max_distance_m]
-        if filtered.size == 0:
-            filtered = radii
-        return float(np.median(filtered))
+            in_range &= ranges <= self.config.max_distance_m
+        return FramePoints(u=uv[order, 0], v=uv[order, 1], ranges=ranges, in_range=in_range)
+
+    def box_distances(self, boxes_xyxy: np.ndarray, frame: FramePoints) -> np.ndarray:
+        """Returns the median range of the points projected into each of the (N, 4) boxes.
+
+        Each box only looks at the points in its u slice of the sorted frame; boxes
+        without points get NaN.
+        """
+
+        boxes = np.asarray(boxes_xyxy, dtype=np.float32).reshape(-1, 4)
+        starts = np.searchsorted(frame.u, boxes[:, 0], side="left")
+        stops = np.searchsorted(frame.u, boxes[:, 2], side="right")
+        distances = np.full(len(boxes), np.nan, dtype=np.float64)
+        for i, (start, stop) in enumerate(zip(starts.tolist(), stops.tolist())):
+            if stop <= start:
+                continue
+            v = frame.v[start:stop]
+            mask = (v >= boxes[i, 1]) & (v <= boxes[i, 3])
+            ranges = frame.ranges[start:stop][mask]
+            # Points inside the configured distance band win; fall back to all points in the box otherwise.
+            filtered = ranges[frame.in_range[start:stop][mask]]
+            distances[i] = _partition_median(filtered if filtered.size else ranges)
+        return distances
 
     def fuse(
         self, det: DetectionResult, pcd: PointCloudFrame, image_shape
     ) -> List[Target3D]:
         targets: List[Target3D] = []
-        for detection in det.detections:
-            in_zone = self._in_danger_zone(detection.bbox_xyxy, image_shape)
-            distance = self._estimate_distance(pcd.points)
+        if len(det) == 0:
+            return targets
+        with metrics.timer("fusion.project"):
+            frame = self.prepare_frame(pcd, image_shape)
+        with metrics.timer("fusion.distances"):
+            distances = self.box_distances(det.boxes, frame)
+        with metrics.timer("fusion.zones"):
+            membership = self.zone_membership(det.boxes, image_shape)
+        zone_names = self.zone_mask.names
+        for box, label, distance, in_zones in zip(det.boxes, det.labels(), distances.tolist(), membership):
+            zones = [zone_names[j] for j in np.flatnonzero(in_zones)]
             targets.append(
                 Target3D(
-                    class_name=detection.class_name,
+                    class_name=label,
                     distance_m=distance,
-                    in_danger_zone=in_zone,
-                    bbox_xyxy=detection.bbox_xyxy,
+                    in_danger_zone=bool(zones),
+                    bbox_xyxy=box,
                     timestamp=det.timestamp,
+                    zones=zones,
                 )
             )
         return targets
@@ -0,0 +1,135 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from demo.types import PointCloudFrame
+
+
+@dataclass
+class PreprocessStats:
+    points_in: int
+    points_out: int
+    elapsed_ms: float
+
+
+def crop_by_range(points: np.ndarray, min_distance_m: float, max_distance_m: float) -> np.ndarray:
+    """Drops non-finite points and, for bounds > 0, points outside [min_distance_m, max_distance_m]."""
+    ranges_sq = np.einsum("ij,ij->i", points, points)
+    keep = np.isfinite(ranges_sq)
+    if min_distance_m > 0:
+        keep &= ranges_sq >= min_distance_m * min_distance_m
+    if max_distance_m > 0:
+        keep &= ranges_sq <= max_distance_m * max_distance_m
+    return points if keep.all() else points[keep]
+
+
+def voxel_downsample(points: np.ndarray, voxel_size_m: float) -> np.ndarray:
+    """Replaces the points of each occupied voxel by their centroid."""
+    if voxel_size_m <= 0 or len(points) == 0:
+        return points
+    coords = np.floor(points / voxel_size_m).astype(np.int64)
+    coords -= coords.min(axis=0)
+    dims = coords.max(axis=0) + 1
+    # Dense linear index of the voxel grid, used as the hash key.
+    keys = (coords[:, 0] * dims[1] + coords[:, 1]) * dims[2] + coords[:, 2]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    out = np.empty((len(counts), 3), dtype=np.float32)
+    for axis in range(3):
+        out[:, axis] = np.bincount(inverse, weights=points[:, axis], minlength=len(counts)) / counts
+    return out
+
+
+def remove_ground(
+    points: np.ndarray,
+    distance_m: float,
+    iterations: int,
+    sample_size: int,
+    max_slope_deg: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Drops the dominant near-horizontal plane found by a vectorized RANSAC.
+
+    All candidate planes are scored at once against a random subsample drawn
+    from the lowest points, then the winner is applied to the full cloud.
+    """
+
+    if len(points) < 3 or iterations <= 0:
+        return points
+    low = points[points[:, 2] <= np.percentile(points[:, 2], 30)]
+    if len(low) < 3:
+        return points
+    sample = low[rng.choice(len(low), size=min(len(low), sample_size), replace=False)]
+
+    tri = sample[rng.integers(0, len(sample), size=(iterations, 3))]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    norms = np.linalg.norm(normals, axis=1)
+    valid = norms > 1e-6
+    normals[valid] /= norms[valid, None]
+    valid &= np.abs(normals[:, 2]) >= np.cos(np.deg2rad(max_slope_deg))
+    if not valid.any():
+        return points
+    normals = normals[valid]
+    offsets = -np.einsum("ij,ij->i", normals, tri[valid, 0])
+
+    inliers = (np.abs(sample @ normals.T + offsets) < distance_m).sum(axis=0)
+    best = int(np.argmax(inliers))
+    keep = np.abs(points @ normals[best] + offsets[best]) >= distance_m
+    return points[keep]
+
+
+class PointCloudPreprocessor:
+    """Per-frame range crop, voxel downsampling and ground removal, run once before fusion and rendering."""
+
+    def __init__(self, config) -> None:
+        self.config = config
+        # Its own range, not fusion's: the fusion distance fallback needs points beyond fusion.max_distance_m.
+        self.min_distance_m = config.crop_min_distance_m if config.crop_range else 0.0
+        self.max_distance_m = config.crop_max_distance_m if config.crop_range else 0.0
+        self._rng = np.random.default_rng(0)
+        self.last_stats: Optional[PreprocessStats] = None
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._points_in = 0
+        self._points_out = 0
+        self._elapsed_ms = 0.0
+
+    def process(self, pcd: PointCloudFrame) -> PointCloudFrame:
+        if not self.config.enabled:
+            return pcd
+        start = time.perf_counter()
+        points = np.asarray(pcd.points, dtype=np.float32)
+        points_in = len(points)
+        # Always run: it also removes NaN/inf points, which voxel_downsample cannot bin.
+        points = crop_by_range(points, self.min_distance_m, self.max_distance_m)
+        points = voxel_downsample(points, self.config.voxel_size_m)
+        if self.config.remove_ground:
+            points = remove_ground(
+                points,
+                self.config.ground_distance_m,
+                self.config.ground_ransac_iterations,
+                self.config.ground_sample_size,
+                self.config.ground_max_slope_deg,
+                self._rng,
+            )
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.last_stats = PreprocessStats(points_in=points_in, points_out=len(points), elapsed_ms=elapsed_ms)
+        with self._lock:
+            self._frames += 1
+            self._points_in += points_in
+            self._points_out += len(points)
+            self._elapsed_ms += elapsed_ms
+        return PointCloudFrame(points=points, timestamp=pcd.timestamp)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            frames = max(1, self._frames)
+            return {
+                "frames": self._frames,
+                "mean_points_in": self._points_in / frames,
+                "mean_points_out": self._points_out / frames,
+                "mean_ms": self._elapsed_ms / frames,
+            }
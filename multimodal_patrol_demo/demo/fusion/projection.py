@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Key aliases: KITTI object calib files vs. the raw-drive calib_cam_to_cam/calib_velo_to_cam files.
+_P2_KEYS = ("P2", "P_rect_02")
+_R0_KEYS = ("R0_rect", "R_rect_00")
+_TR_KEYS = ("Tr_velo_to_cam", "Tr_velo_cam")
+
+
+def _parse_calib_file(path: Path) -> Dict[str, np.ndarray]:
+    values: Dict[str, np.ndarray] = {}
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if ":" not in line:
+                continue
+            key, raw = line.split(":", maxsplit=1)
+            try:
+                values[key.strip()] = np.array([float(x) for x in raw.split()], dtype=np.float64)
+            except ValueError:
+                # Non-numeric entries such as calib_time.
+                continue
+    return values
+
+
+def _first(values: Dict[str, np.ndarray], keys: Tuple[str, ...], path: Path) -> np.ndarray:
+    for key in keys:
+        if key in values:
+            return values[key]
+    raise KeyError(f"Calibration file {path} is missing one of {keys}")
+
+
+@dataclass
+class KittiCalibration:
+    P2: np.ndarray
+    R0_rect: np.ndarray
+    Tr_velo_to_cam: np.ndarray
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "KittiCalibration":
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Missing calibration file: {path}")
+        values = _parse_calib_file(path)
+        P2 = _first(values, _P2_KEYS, path).reshape(3, 4)
+        R0 = _first(values, _R0_KEYS, path).reshape(3, 3)
+        if any(k in values for k in _TR_KEYS):
+            Tr = _first(values, _TR_KEYS, path).reshape(3, 4)
+        elif "R" in values and "T" in values:
+            Tr = np.hstack([values["R"].reshape(3, 3), values["T"].reshape(3, 1)])
+        else:
+            raise KeyError(f"Calibration file {path} is missing Tr_velo_to_cam")
+        return cls(P2=P2, R0_rect=R0, Tr_velo_to_cam=Tr)
+
+    def velo_to_image(self) -> np.ndarray:
+        """Returns the combined 3x4 matrix P2 @ R0_rect @ Tr_velo_to_cam."""
+        R0 = np.eye(4)
+        R0[:3, :3] = self.R0_rect
+        Tr = np.eye(4)
+        Tr[:3, :] = self.Tr_velo_to_cam
+        return self.P2 @ R0 @ Tr
+
+
+def virtual_camera_matrix(image_shape, hfov_deg: float) -> np.ndarray:
+    """A 3x4 pinhole projection for a camera at the LiDAR origin looking along +x (x forward, y left, z up).
+
+    Stands in for a calibration so each box still selects the points in its own viewing direction.
+    """
+
+    h, w = image_shape
+    f = (w / 2.0) / np.tan(np.radians(hfov_deg) / 2.0)
+    return np.array(
+        [
+            [w / 2.0, -f, 0.0, 0.0],
+            [h / 2.0, 0.0, -f, 0.0],
+            [1.0, 0.0, 0.0, 0.0],
+        ]
+    )
+
+
+@dataclass
+class ProjectedPoints:
+    uv: np.ndarray
+    ranges: np.ndarray
+
+
+def project_to_image(
+    points: np.ndarray, velo_to_image: np.ndarray, image_shape, min_depth_m: float = 0.1
+) -> ProjectedPoints:
+    """Projects LiDAR points into pixel coordinates, keeping those in front of the camera and inside the image.
+
+    ``ranges`` holds the Euclidean LiDAR range of each kept point, aligned with ``uv``.
+    """
+
+    h, w = image_shape
+    pts = np.asarray(points, dtype=np.float32)
+    proj = pts @ velo_to_image[:, :3].T.astype(np.float32) + velo_to_image[:, 3].astype(np.float32)
+    depth = proj[:, 2]
+    keep = depth > min_depth_m
+    proj = proj[keep]
+    uv = proj[:, :2] / proj[:, 2:3]
+    inside = (uv[:, 0] >= 0) & (uv[:, 0] < w) & (uv[:, 1] >= 0) & (uv[:, 1] < h)
+    kept = pts[keep][inside]
+    ranges = np.sqrt(np.einsum("ij,ij->i", kept, kept))
+    return ProjectedPoints(uv=uv[inside], ranges=ranges)
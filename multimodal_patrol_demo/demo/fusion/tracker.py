@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from demo.types import Target3D
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes, as an (N, M) matrix."""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0.0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def greedy_assignment(scores: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """Matches rows to columns by descending score, skipping pairs below ``threshold``."""
+    rows, cols = np.nonzero(scores >= threshold)
+    order = np.argsort(-scores[rows, cols], kind="stable")
+    used_rows = set()
+    used_cols = set()
+    matches: List[Tuple[int, int]] = []
+    for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        matches.append((r, c))
+    return matches
+
+
+@dataclass
+class Track:
+    track_id: int
+    class_name: str
+    bbox_xyxy: np.ndarray
+    last_seen: float
+    hits: int = 1
+    misses: int = 0
+
+
+class MultiObjectTracker:
+    """IoU tracker: associates each frame's targets with existing tracks and assigns ``track_id``.
+
+    Tracks not matched for more than ``max_age_s`` seconds of frame time are
+    dropped, so the limit (like the zone dwell timeout) does not depend on the frame rate.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age_s: float = 0.5) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_age_s = max_age_s
+        self.tracks: List[Track] = []
+        self._next_id = 1
+
+    @property
+    def active_track_ids(self) -> List[int]:
+        return [t.track_id for t in self.tracks]
+
+    def update(self, targets: List[Target3D], timestamp: float) -> List[Target3D]:
+        matches: List[Tuple[int, int]] = []
+        if self.tracks and targets:
+            track_boxes = np.stack([t.bbox_xyxy for t in self.tracks])
+            target_boxes = np.stack([t.bbox_xyxy for t in targets])
+            scores = iou_matrix(track_boxes, target_boxes)
+            track_classes = np.array([t.class_name for t in self.tracks])
+            target_classes = np.array([t.class_name for t in targets])
+            scores[track_classes[:, None] != target_classes[None, :]] = 0.0
+            matches = greedy_assignment(scores, self.iou_threshold)
+
+        matched_tracks = set()
+        matched_targets = set()
+        for ti, di in matches:
+            track = self.tracks[ti]
+            track.bbox_xyxy = targets[di].bbox_xyxy
+            track.last_seen = timestamp
+            track.hits += 1
+            track.misses = 0
+            targets[di].track_id = track.track_id
+            matched_tracks.add(ti)
+            matched_targets.add(di)
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if timestamp - t.last_seen <= self.max_age_s]
+
+        for di, target in enumerate(targets):
+            if di in matched_targets:
+                continue
+            track = Track(
+                track_id=self._next_id,
+                class_name=target.class_name,
+                bbox_xyxy=target.bbox_xyxy,
+                last_seen=timestamp,
+            )
+            self._next_id += 1
+            self.tracks.append(track)
+            target.track_id = track.track_id
+        return targets
@@ -1,34 +1,102 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
-from demo.types import Target3D
+from demo.types import AlertEvent, Target3D
+
+ZoneKey = Tuple[int, str]
 
 
 class ZoneMonitor:
-    def __init__(self, stay_time_threshold_s: float):
+    """Tracks dwell time and alert state per (track ID, zone).
+
+    Targets must carry a ``track_id`` (see ``MultiObjectTracker``) and the names
+    of the zones they are in. A track that has not been seen for
+    ``track_timeout_s`` is forgotten, so short detection gaps do not reset its
+    dwell time. ``zone_thresholds`` overrides the dwell threshold per zone name.
+    """
+
+    def __init__(
+        self,
+        stay_time_threshold_s: float,
+        track_timeout_s: float = 1.0,
+        zone_thresholds: Optional[Dict[str, float]] = None,
+    ):
         self.stay_time_threshold_s = stay_time_threshold_s
-        self.current_target_enter_time: Optional[float] = None
-        self.current_in_zone: bool = False
+        self.track_timeout_s = track_timeout_s
+        self.zone_thresholds = dict(zone_thresholds or {})
+        self.enter_times: Dict[ZoneKey, float] = {}
+        self.track_zones: Dict[int, Set[str]] = {}
+        self.last_seen: Dict[int, float] = {}
+        self.alerted: Set[ZoneKey] = set()
+
+    def threshold_for(self, zone_name: str) -> float:
+        return self.zone_thresholds.get(zone_name, self.stay_time_threshold_s)
+
+    def dwell_time(self, track_id: int, zone_name: str, current_time: float) -> float:
+        enter_time = self.enter_times.get((track_id, zone_name))
+        return 0.0 if enter_time is None else current_time - enter_time
+
+    def _leave(self, track_id: int, zone_name: str) -> None:
+        key = (track_id, zone_name)
+        self.enter_times.pop(key, None)
+        self.alerted.discard(key)
 
-    def update(self, targets: List[Target3D], current_time: float) -> tuple[bool, float]:
+    def _forget(self, track_id: int) -> None:
+        for zone_name in self.track_zones.pop(track_id, set()):
+            self._leave(track_id, zone_name)
+        self.last_seen.pop(track_id, None)
+
+    def update(self, targets: List[Target3D], current_time: float) -> tuple[bool, List[AlertEvent]]:
         """
         Returns:
-            A tuple of (is_alert, dwell_time_seconds).
+            A tuple of (is_alert, new_events): whether any person track is
+            currently over the dwell threshold of a zone, and one event for each
+            (track, zone) that crossed it on this frame.
         """
 
-        person_in_zone = any(
-            t.class_name == "person" and t.in_danger_zone for t in targets
-        )
-        if person_in_zone:
-            if not self.current_in_zone:
-                self.current_target_enter_time = current_time
-                self.current_in_zone = True
-        else:
-            self.current_target_enter_time = None
-            self.current_in_zone = False
-
-        dwell = 0.0
-        if self.current_in_zone and self.current_target_enter_time is not None:
-            dwell = current_time - self.current_target_enter_time
-            if dwell >= self.stay_time_threshold_s:
-                return True, dwell
-        return False, dwell
+        events: List[AlertEvent] = []
+        for t in targets:
+            if t.class_name != "person" or t.track_id is None:
+                continue
+            tid = t.track_id
+            self.last_seen[tid] = current_time
+            current = set(t.zones)
+            previous = self.track_zones.get(tid, set())
+            for zone_name in previous - current:
+                self._leave(tid, zone_name)
+            self.track_zones[tid] = current
+
+            for zone_name in t.zones:
+                key = (tid, zone_name)
+                enter_time = self.enter_times.setdefault(key, current_time)
+                dwell = current_time - enter_time
+                if dwell >= self.threshold_for(zone_name) and key not in self.alerted:
+                    self.alerted.add(key)
+                    events.append(
+                        AlertEvent(
+                            timestamp=current_time,
+                            class_name=t.class_name,
+                            distance_m=t.distance_m,
+                            zone_name=zone_name,
+                            duration_s=dwell,
+                            track_id=tid,
+                        )
+                    )
+
+        stale = [
+            tid for tid, seen in self.last_seen.items() if current_time - seen > self.track_timeout_s
+        ]
+        for tid in stale:
+            self._forget(tid)
+        return bool(self.alerted), events
+
+
+def create_zone_monitor(fusion_config, alert_config) -> ZoneMonitor:
+    return ZoneMonitor(
+        alert_config.stay_time_threshold_s,
+        alert_config.track_timeout_s,
+        zone_thresholds={
+            z.name: z.stay_time_threshold_s
+            for z in fusion_config.zones
+            if z.stay_time_threshold_s is not None
+        },
+    )
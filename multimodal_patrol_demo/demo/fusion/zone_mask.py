@@ -0,0 +1,77 @@
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+# One bit per zone in a uint32 label mask, so overlapping zones stay distinguishable.
+MAX_ZONES = 32
+
+
+def zone_polygon_pixels(polygon: List[List[float]], image_shape) -> np.ndarray:
+    """Converts a normalized polygon into int32 pixel coordinates for ``image_shape`` (h, w)."""
+    h, w = image_shape[:2]
+    pts = np.asarray(polygon, dtype=np.float32).reshape(-1, 2) * np.array([w, h], dtype=np.float32)
+    return np.round(pts).astype(np.int32)
+
+
+class ZoneMask:
+    """Rasterizes named polygon zones once per image shape and answers membership by lookup."""
+
+    def __init__(self, zones) -> None:
+        if len(zones) > MAX_ZONES:
+            raise ValueError(f"At most {MAX_ZONES} zones are supported, got {len(zones)}")
+        self.zones = list(zones)
+        self.names = [z.name for z in self.zones]
+        self._bits = (np.uint32(1) << np.arange(len(self.zones), dtype=np.uint32)).astype(np.uint32)
+        self._masks: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def mask_for(self, image_shape) -> np.ndarray:
+        shape = (int(image_shape[0]), int(image_shape[1]))
+        mask = self._masks.get(shape)
+        if mask is None:
+            mask = np.zeros(shape, dtype=np.uint32)
+            layer = np.zeros(shape, dtype=np.uint8)
+            for i, zone in enumerate(self.zones):
+                layer[:] = 0
+                cv2.fillPoly(layer, [zone_polygon_pixels(zone.polygon, shape)], 1)
+                mask[layer > 0] |= self._bits[i]
+            self._masks[shape] = mask
+        return mask
+
+    def _lookup(self, xs: np.ndarray, ys: np.ndarray, image_shape) -> np.ndarray:
+        mask = self.mask_for(image_shape)
+        h, w = mask.shape
+        xi = np.clip(xs.astype(np.int64), 0, w - 1)
+        yi = np.clip(ys.astype(np.int64), 0, h - 1)
+        return mask[yi, xi]
+
+    def membership(
+        self,
+        boxes_xyxy: np.ndarray,
+        image_shape,
+        mode: str = "center",
+        min_overlap: float = 0.5,
+        footprint_samples: int = 9,
+    ) -> np.ndarray:
+        """Returns an (N, num_zones) boolean matrix of zone membership for (N, 4) boxes.
+
+        ``center`` tests the box centre; ``footprint`` samples the bottom edge of the
+        box (where a person stands) and requires ``min_overlap`` of it inside the zone.
+        """
+
+        boxes = np.asarray(boxes_xyxy, dtype=np.float32).reshape(-1, 4)
+        if not self.zones or len(boxes) == 0:
+            return np.zeros((len(boxes), len(self.zones)), dtype=bool)
+        if mode == "center":
+            labels = self._lookup(
+                (boxes[:, 0] + boxes[:, 2]) / 2.0, (boxes[:, 1] + boxes[:, 3]) / 2.0, image_shape
+            )
+            return (labels[:, None] & self._bits[None, :]) != 0
+        if mode == "footprint":
+            t = np.linspace(0.0, 1.0, footprint_samples, dtype=np.float32)
+            xs = boxes[:, 0:1] + (boxes[:, 2:3] - boxes[:, 0:1]) * t[None, :]
+            ys = np.broadcast_to(boxes[:, 3:4] - 1.0, xs.shape)
+            labels = self._lookup(xs, ys, image_shape)
+            inside = (labels[:, :, None] & self._bits[None, None, :]) != 0
+            return inside.mean(axis=1) >= min_overlap
+        raise ValueError(f"Unknown zone membership mode: {mode}")
@@ -1,14 +1,41 @@
 from demo.inference.backend_base import InferenceBackend
-from demo.inference.cpu_backend import CPUBackend
+from demo.inference.batcher import MicroBatcher
 from demo.inference.dummy_ascend_backend import DummyAscendBackend
 
 
 def create_backend(config) -> InferenceBackend:
+    # Heavy runtimes (torch, onnxruntime) are imported only for the selected backend.
     backend = config.backend.lower()
     if backend == "cpu":
+        from demo.inference.cpu_backend import CPUBackend
+
         return CPUBackend(config)
+    if backend == "onnx":
+        from demo.inference.onnx_backend import OnnxBackend
+
+        return OnnxBackend(config)
     if backend == "ascend":
         return DummyAscendBackend(config)
     raise ValueError(f"Unknown backend: {config.backend}")
 
-__all__ = ["create_backend", "InferenceBackend", "CPUBackend", "DummyAscendBackend"]
+
+def __getattr__(name):
+    if name == "CPUBackend":
+        from demo.inference.cpu_backend import CPUBackend
+
+        return CPUBackend
+    if name == "OnnxBackend":
+        from demo.inference.onnx_backend import OnnxBackend
+
+        return OnnxBackend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "create_backend",
+    "InferenceBackend",
+    "CPUBackend",
+    "OnnxBackend",
+    "DummyAscendBackend",
+    "MicroBatcher",
+]
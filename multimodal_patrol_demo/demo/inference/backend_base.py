@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 from demo.types import DetectionResult, RGBFrame
 
@@ -11,3 +12,10 @@ class InferenceBackend(ABC):
     @abstractmethod
     def infer(self, frame: RGBFrame) -> DetectionResult:
         raise NotImplementedError
+
+    def infer_batch(self, frames: List[RGBFrame]) -> List[DetectionResult]:
+        """Runs several frames at once; results are in the order of ``frames``.
+
+        Backends that can batch on the device should override this.
+        """
+        return [self.infer(frame) for frame in frames]
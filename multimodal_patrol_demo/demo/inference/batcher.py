@@ -0,0 +1,95 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from demo.inference.backend_base import InferenceBackend
+from demo.types import DetectionResult, RGBFrame
+
+
+class MicroBatcher:
+    """Groups frames submitted from any number of threads into ``infer_batch`` calls.
+
+    A batch is flushed when it reaches ``max_batch_size`` or when its oldest
+    frame has waited ``max_wait_ms``. Each ``submit`` returns a future holding
+    that frame's own ``DetectionResult``.
+    """
+
+    def __init__(self, backend: InferenceBackend, max_batch_size: int, max_wait_ms: float) -> None:
+        self.backend = backend
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[RGBFrame, Future]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.frames = 0
+
+    def start(self) -> "MicroBatcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+
+    def submit(self, frame: RGBFrame) -> "Future[DetectionResult]":
+        future: "Future[DetectionResult]" = Future()
+        self._queue.put((frame, future))
+        return future
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.frames / self.batches if self.batches else 0.0
+
+    def _collect(self) -> List[Tuple[RGBFrame, Future]]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            batch = [(frame, future) for frame, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = list(self.backend.infer_batch([frame for frame, _ in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"{type(self.backend).__name__}.infer_batch returned {len(results)} results "
+                        f"for {len(batch)} frames"
+                    )
+            except Exception as exc:  # noqa: BLE001
+                # Every future must be resolved, or the fuse stage waits on it forever.
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.frames += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
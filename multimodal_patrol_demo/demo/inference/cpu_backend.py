@@ -4,20 +4,30 @@ import numpy as np
 import torch
 
 from demo.inference.backend_base import InferenceBackend
+from demo.inference.postprocess import class_name_table, yolov5_postprocess
+from demo.inference.preprocess import LetterboxInfo, LetterboxPreprocessor, scale_boxes_to_original
 from demo.config import ModelConfig
-from demo.types import Detection, DetectionResult, RGBFrame
+from demo.metrics import metrics
+from demo.types import DetectionResult, RGBFrame
 
 
 class CPUBackend(InferenceBackend):
     def __init__(self, config: ModelConfig) -> None:
         self.config = config
         self.model = None
+        self.class_names: List[str] = []
         if config.use_gpu and torch.cuda.is_available():
             self.device = torch.device("cuda")
         else:
             self.device = torch.device("cpu")
+        self.preprocessor = LetterboxPreprocessor(
+            (config.input_size[0], config.input_size[1]), max_batch=config.batch_size
+        )
 
     def load(self):
+        if self.config.num_threads > 0:
+            # Process-wide; multistream workers rely on this to share the cores instead of each taking all.
+            torch.set_num_threads(self.config.num_threads)
         weights_path = self.config.weights_path
         self.model = torch.hub.load(
             "ultralytics/yolov5",
@@ -27,34 +37,45 @@ class CPUBackend(InferenceBackend):
         )
         self.model.to(self.device)
         self.model.eval()
+        self.class_names = class_name_table(self.model.names)
 
-    def _postprocess(self, results) -> List[Detection]:
-        detections: List[Detection] = []
-        if results is None:
-            return detections
-        for *xyxy, conf, cls in results.xyxy[0].tolist():
-            class_id = int(cls)
-            bbox = np.array(xyxy, dtype=np.float32)
-            detections.append(
-                Detection(
-                    class_id=class_id,
-                    class_name=self.model.names[class_id],
-                    confidence=float(conf),
-                    bbox_xyxy=bbox,
-                )
-            )
-        return detections
+    def _postprocess(self, pred: np.ndarray, info: LetterboxInfo, timestamp: float) -> DetectionResult:
+        boxes, scores, class_ids = yolov5_postprocess(
+            pred,
+            self.config.conf_threshold,
+            self.config.iou_threshold,
+            self.config.max_detections,
+        )
+        return DetectionResult(
+            boxes=scale_boxes_to_original(boxes, info.ratio, info.pad, info.image_shape),
+            scores=scores,
+            class_ids=class_ids,
+            class_names=self.class_names,
+            timestamp=timestamp,
+        )
 
     def infer(self, frame: RGBFrame) -> DetectionResult:
+        return self.infer_batch([frame])[0]
+
+    def infer_batch(self, frames: List[RGBFrame]) -> List[DetectionResult]:
         if self.model is None:
             raise RuntimeError("Model not loaded. Call load() first.")
-        img_rgb = frame.image[:, :, ::-1]
-        tensor = (
-            torch.from_numpy(img_rgb).permute(2, 0, 1).unsqueeze(0).float() / 255.0
-        )
-        tensor = tensor.to(self.device)
-        results = self.model(tensor, size=self.config.input_size[0])
-        if hasattr(results, "to"):
-            results = results.to("cpu")
-        detections = self._postprocess(results)
-        return DetectionResult(detections=detections, timestamp=frame.timestamp)
+        if not frames:
+            return []
+        # Letterbox straight to input_size into the preprocessor's reused buffer;
+        # torch.from_numpy shares that memory, so no full-resolution tensors are made.
+        with metrics.timer("infer.preprocess"):
+            blob, infos = self.preprocessor([frame.image for frame in frames])
+        with metrics.timer("infer.forward"):
+            tensor = torch.from_numpy(blob).to(self.device)
+            with torch.inference_mode():
+                # A tensor input bypasses AutoShape's own preprocessing and NMS.
+                pred = self.model(tensor)
+            if isinstance(pred, (list, tuple)):
+                pred = pred[0]
+            pred = pred.float().cpu().numpy()
+        with metrics.timer("infer.postprocess"):
+            return [
+                self._postprocess(pred[i], info, frame.timestamp)
+                for i, (frame, info) in enumerate(zip(frames, infos))
+            ]
@@ -1,3 +1,5 @@
+from typing import List
+
 from demo.inference.backend_base import InferenceBackend
 from demo.types import DetectionResult, RGBFrame
 
@@ -11,4 +13,7 @@ class DummyAscendBackend(InferenceBackend):
         return None
 
     def infer(self, frame: RGBFrame) -> DetectionResult:
-        return DetectionResult(detections=[], timestamp=frame.timestamp)
+        return DetectionResult.empty(frame.timestamp)
+
+    def infer_batch(self, frames: List[RGBFrame]) -> List[DetectionResult]:
+        return [DetectionResult.empty(f.timestamp) for f in frames]
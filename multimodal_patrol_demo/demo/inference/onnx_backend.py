@@ -0,0 +1,109 @@
+import ast
+import os
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import onnxruntime as ort
+
+from demo.config import ModelConfig
+from demo.inference.backend_base import InferenceBackend
+from demo.inference.postprocess import class_name_table, yolov5_postprocess
+from demo.inference.preprocess import LetterboxInfo, LetterboxPreprocessor, scale_boxes_to_original
+from demo.metrics import metrics
+from demo.types import DetectionResult, RGBFrame
+
+# Class table of the stock COCO-trained YOLOv5 weights, used when the exported
+# model carries no ``names`` metadata.
+COCO_CLASS_NAMES = (
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
+    "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog",
+    "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella",
+    "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite",
+    "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket", "bottle",
+    "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich", "orange",
+    "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant",
+    "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard", "cell phone",
+    "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase", "scissors",
+    "teddy bear", "hair drier", "toothbrush",
+)
+
+
+class OnnxBackend(InferenceBackend):
+    """YOLOv5 exported to ONNX, run offline with ONNX Runtime on the CPU."""
+
+    def __init__(self, config: ModelConfig) -> None:
+        self.config = config
+        self.session = None
+        self.input_name = ""
+        self.input_hw: Tuple[int, int] = (int(config.input_size[0]), int(config.input_size[1]))
+        self.batchable = False
+        self.class_names: Sequence[str] = COCO_CLASS_NAMES
+        self.preprocessor = LetterboxPreprocessor(self.input_hw, max_batch=config.batch_size)
+
+    def load(self):
+        weights_path = Path(self.config.weights_path)
+        if not weights_path.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found: {weights_path}. Export one with yolov5's "
+                "export.py --include onnx and point model.weights_path at it."
+            )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = self.config.num_threads or (os.cpu_count() or 1)
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(weights_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim, _, height, width = model_input.shape
+        if isinstance(height, int) and isinstance(width, int) and (height, width) != self.input_hw:
+            self.input_hw = (height, width)
+            self.preprocessor = LetterboxPreprocessor(self.input_hw, max_batch=self.config.batch_size)
+        self.batchable = not isinstance(batch_dim, int) or batch_dim > 1
+
+        names = self.session.get_modelmeta().custom_metadata_map.get("names")
+        if names:
+            self.class_names = class_name_table(ast.literal_eval(names))
+
+    def _decode(self, pred: np.ndarray, frame: RGBFrame, info: LetterboxInfo) -> DetectionResult:
+        boxes, scores, class_ids = yolov5_postprocess(
+            pred,
+            self.config.conf_threshold,
+            self.config.iou_threshold,
+            self.config.max_detections,
+        )
+        return DetectionResult(
+            boxes=scale_boxes_to_original(boxes, info.ratio, info.pad, info.image_shape),
+            scores=scores,
+            class_ids=class_ids,
+            class_names=self.class_names,
+            timestamp=frame.timestamp,
+        )
+
+    def infer(self, frame: RGBFrame) -> DetectionResult:
+        return self.infer_batch([frame])[0]
+
+    def infer_batch(self, frames: List[RGBFrame]) -> List[DetectionResult]:
+        if self.session is None:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        if self.batchable:
+            with metrics.timer("infer.preprocess"):
+                blob, infos = self.preprocessor([frame.image for frame in frames])
+            with metrics.timer("infer.forward"):
+                preds = self.session.run(None, {self.input_name: blob})[0]
+            with metrics.timer("infer.postprocess"):
+                return [self._decode(pred, frame, info) for pred, frame, info in zip(preds, frames, infos)]
+        # Static batch-1 export: one run per frame.
+        results = []
+        for frame in frames:
+            with metrics.timer("infer.preprocess"):
+                blob, infos = self.preprocessor([frame.image])
+            with metrics.timer("infer.forward"):
+                pred = self.session.run(None, {self.input_name: blob})[0][0]
+            with metrics.timer("infer.postprocess"):
+                results.append(self._decode(pred, frame, infos[0]))
+        return results
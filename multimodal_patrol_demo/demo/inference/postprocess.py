@@ -0,0 +1,90 @@
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+# Offset added per class so one NMS pass never suppresses across classes.
+_CLASS_OFFSET = 7680.0
+
+
+def class_name_table(names: Union[Sequence[str], dict]) -> List[str]:
+    """Normalizes a YOLOv5 ``names`` list or {id: name} dict into a list indexed by class id."""
+    if isinstance(names, dict):
+        table = [str(i) for i in range(max(names) + 1)] if names else []
+        for class_id, name in names.items():
+            table[int(class_id)] = name
+        return table
+    return list(names)
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    out = np.empty_like(boxes)
+    half_w = boxes[:, 2] / 2.0
+    half_h = boxes[:, 3] / 2.0
+    out[:, 0] = boxes[:, 0] - half_w
+    out[:, 1] = boxes[:, 1] - half_h
+    out[:, 2] = boxes[:, 0] + half_w
+    out[:, 3] = boxes[:, 1] + half_h
+    return out
+
+
+def nms(
+    boxes: np.ndarray, scores: np.ndarray, iou_threshold: float, max_output: int = 0
+) -> np.ndarray:
+    """Greedy NMS; each step suppresses against all remaining boxes in one vectorized IoU.
+
+    Stops early once ``max_output`` boxes are kept (0 means no limit).
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        if rest.size == 0 or len(keep) == max_output:
+            break
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0.0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0.0, None)
+        inter = w * h
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def yolov5_postprocess(
+    pred: np.ndarray,
+    conf_threshold: float,
+    iou_threshold: float,
+    max_detections: int,
+    max_candidates: int = 30000,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Decodes one image of raw YOLOv5 output (N, 5 + num_classes).
+
+    Returns (boxes_xyxy (K, 4), scores (K,), class_ids (K,)) in network input coordinates.
+    """
+
+    pred = pred[pred[:, 4] > conf_threshold]
+    if pred.shape[0] == 0:
+        return (
+            np.zeros((0, 4), dtype=np.float32),
+            np.zeros((0,), dtype=np.float32),
+            np.zeros((0,), dtype=np.int64),
+        )
+    class_scores = pred[:, 5:] * pred[:, 4:5]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_ids)), class_ids]
+    keep = scores > conf_threshold
+    boxes = xywh_to_xyxy(pred[keep, :4])
+    scores = scores[keep]
+    class_ids = class_ids[keep]
+    if len(scores) > max_candidates:
+        top = np.argpartition(-scores, max_candidates)[:max_candidates]
+        boxes, scores, class_ids = boxes[top], scores[top], class_ids[top]
+
+    kept = nms(boxes + class_ids[:, None] * _CLASS_OFFSET, scores, iou_threshold, max_detections)
+    return (
+        boxes[kept].astype(np.float32),
+        scores[kept].astype(np.float32),
+        class_ids[kept].astype(np.int64),
+    )
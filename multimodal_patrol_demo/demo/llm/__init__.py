@@ -1,8 +1,12 @@
 from demo.llm.llm_client import BaseLLMClient, create_llm_client
+from demo.llm.narrator import EventNarrator
 from demo.llm.report_generator import ReportGenerator
+from demo.llm.summarizer import StreamingSummarizer
 
 __all__ = [
     "BaseLLMClient",
     "create_llm_client",
+    "EventNarrator",
     "ReportGenerator",
+    "StreamingSummarizer",
 ]
@@ -0,0 +1,169 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Optional
+
+from demo.llm.llm_client import BaseLLMClient, fallback_text
+from demo.metrics import metrics
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def bucket_numbers(text: str, bucket: float) -> str:
+    """Rounds every number in ``text`` to a multiple of ``bucket`` (no-op for ``bucket <= 0``)."""
+    if bucket <= 0:
+        return text
+    # Digits after the point of the step itself (0.25 -> 2), so rounded values print exactly.
+    decimals = max(0, -Decimal(repr(bucket)).normalize().as_tuple().exponent)
+
+    def _round(match: re.Match) -> str:
+        return f"{round(float(match.group()) / bucket) * bucket:.{decimals}f}"
+
+    return _NUMBER.sub(_round, text)
+
+
+def cache_key(model_name: str, system_prompt: str, user_prompt: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model_name, system_prompt, user_prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class CachedLLMClient(BaseLLMClient):
+    """Wraps an LLM client with a persistent SQLite response cache.
+
+    Entries are keyed on a hash of (model, system prompt, user prompt). With
+    ``numeric_bucket > 0`` numbers in the user prompt are rounded to that
+    step for the key only (the exact prompt is still sent), so near-identical
+    events share one reply. Entries older than ``ttl_s`` are ignored and
+    purged; beyond ``max_entries`` entries or ``max_bytes`` of stored
+    responses the least recently used are evicted. Failed calls fall back to
+    template text and are not cached.
+    """
+
+    def __init__(
+        self,
+        client: BaseLLMClient,
+        path: str | Path,
+        model_name: str = "",
+        ttl_s: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        max_bytes: int = 0,
+        numeric_bucket: float = 0.0,
+    ) -> None:
+        self.client = client
+        self.path = Path(path)
+        self.model_name = model_name
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.numeric_bucket = numeric_bucket
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The narrator thread and the main thread share one connection.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._evict(time.time())
+
+    def _lookup(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_s > 0 and now - row[1] > self.ttl_s):
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def _store(self, key: str, response: str, now: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._conn.commit()
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        with self._lock:
+            if self.ttl_s > 0:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_s,))
+            if self.max_entries > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            if self.max_bytes > 0:
+                # Running total of response bytes from the most recently used down.
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM (SELECT key, SUM(LENGTH(CAST(response AS BLOB))) "
+                    "OVER (ORDER BY last_used DESC, key) AS total FROM responses) WHERE total > ?)",
+                    (self.max_bytes,),
+                )
+            self._conn.commit()
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        key = cache_key(self.model_name, system_prompt, bucket_numbers(user_prompt, self.numeric_bucket))
+        now = time.time()
+        cached = self._lookup(key, now)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            metrics.inc("llm.cache_hits")
+            return cached
+        metrics.inc("llm.cache_misses")
+        response = self.client.complete(system_prompt, user_prompt)
+        self._store(key, response, now)
+        return response
+
+    def generate(self, system_prompt: str, user_prompt: str) -> str:
+        try:
+            return self.complete(system_prompt, user_prompt)
+        except Exception as exc:  # noqa: BLE001
+            return fallback_text(user_prompt, exc)
+
+    @property
+    def configured(self) -> bool:
+        return self.client.configured
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            hits, total = self.hits, self.hits + self.misses
+        return hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0, "entries": entries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        self.client.close()
@@ -3,13 +3,37 @@ from abc import ABC, abstractmethod
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from demo.metrics import metrics
+
+# Transient failures worth retrying; other 4xx errors are returned at once.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 
 class BaseLLMClient(ABC):
     @abstractmethod
     def generate(self, system_prompt: str, user_prompt: str) -> str:
+        """Returns the reply, or a template fallback string if the call fails."""
         ...
 
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Like ``generate`` but raises instead of falling back, so callers (e.g. caches) can tell them apart."""
+        return self.generate(system_prompt, user_prompt)
+
+    @property
+    def configured(self) -> bool:
+        """``False`` when every call would only return template text, so callers can skip it."""
+        return True
+
+    def close(self) -> None:
+        """Releases connections or files held by the client."""
+
+
+def fallback_text(user_prompt: str, exc: Exception) -> str:
+    return f"[调用LLM失败，使用模板] {user_prompt[:200]}，错误：{exc}"
+
 
 class DummyLLMClient(BaseLLMClient):
     """Fallback implementation used when no provider is configured."""
@@ -17,22 +41,44 @@ class DummyLLMClient(BaseLLMClient):
     def generate(self, system_prompt: str, user_prompt: str) -> str:
         return f"[模板输出] {user_prompt[:200]}"
 
+    @property
+    def configured(self) -> bool:
+        return False
+
 
 class OpenAILLMClient(BaseLLMClient):
+    """Chat-completions client over a pooled keep-alive session with retry and backoff."""
+
     def __init__(self, config) -> None:
         self.config = config
         self.api_key: Optional[str] = os.environ.get(config.api_key_env, "")
         self.api_base = config.api_base.rstrip("/")
         self.model_name = config.model_name
+        self.session = self._create_session()
 
-    def generate(self, system_prompt: str, user_prompt: str) -> str:
+    def _create_session(self) -> requests.Session:
+        retry = Retry(
+            total=getattr(self.config, "max_retries", 2),
+            backoff_factor=getattr(self.config, "retry_backoff_s", 0.5),
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        pool_size = getattr(self.config, "pool_size", 4)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        )
+        return session
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
         if not self.api_key:
-            return f"[未配置API_KEY，使用模板] {user_prompt[:200]}"
+            raise RuntimeError(f"API key not set in ${self.config.api_key_env}")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": self.model_name,
             "messages": [
@@ -42,23 +88,50 @@ class OpenAILLMClient(BaseLLMClient):
             "temperature": 0.3,
         }
 
-        try:
-            resp = requests.post(
+        with metrics.timer("llm.request"):
+            resp = self.session.post(
                 f"{self.api_base}/chat/completions",
-                headers=headers,
                 json=payload,
                 timeout=self.config.timeout_s,
             )
-            resp.raise_for_status()
-            data = resp.json()
-            return data["choices"][0]["message"]["content"].strip()
+        resp.raise_for_status()
+        data = resp.json()
+        return data["choices"][0]["message"]["content"].strip()
+
+    def generate(self, system_prompt: str, user_prompt: str) -> str:
+        if not self.api_key:
+            return f"[未配置API_KEY，使用模板] {user_prompt[:200]}"
+        try:
+            return self.complete(system_prompt, user_prompt)
         except Exception as exc:  # noqa: BLE001
-            return f"[调用LLM失败，使用模板] {user_prompt[:200]}，错误：{exc}"
+            return fallback_text(user_prompt, exc)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def close(self) -> None:
+        self.session.close()
 
 
 def create_llm_client(config) -> BaseLLMClient:
     if not getattr(config, "enabled", False):
         return DummyLLMClient()
     if getattr(config, "provider", "") == "openai":
-        return OpenAILLMClient(config)
+        client: OpenAILLMClient = OpenAILLMClient(config)
+        # Without a key every call is answered locally with the "not configured" template; nothing to cache.
+        if getattr(config, "cache_enabled", False) and client.api_key:
+            # Local import: demo.llm.cache itself imports this module.
+            from demo.llm.cache import CachedLLMClient
+
+            client = CachedLLMClient(
+                client,
+                config.cache_path,
+                model_name=config.model_name,
+                ttl_s=config.cache_ttl_s,
+                max_entries=config.cache_max_entries,
+                max_bytes=config.cache_max_bytes,
+                numeric_bucket=config.cache_numeric_bucket,
+            )
+        return client
     return DummyLLMClient()
@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from demo.llm.report_generator import ReportGenerator
+from demo.metrics import metrics
+from demo.types import AlertEvent
+
+_STOP = object()
+
+
+class EventNarrator:
+    """Describes alert events with the LLM on a background thread.
+
+    ``submit`` never blocks: the event is queued (or, with the queue full,
+    left with its template text) and ``latest_text`` immediately returns a
+    template description of the newest event, replaced by the LLM text once
+    it arrives. Finished narrations are also stored in ``event.extra_info``
+    and passed to ``on_text``. Up to ``batch_size`` queued events are
+    narrated together in one LLM call. Without a configured LLM client
+    (no API key) events get their template text at once and are counted
+    as ``templated``, not as failures.
+    """
+
+    def __init__(
+        self,
+        report_generator: ReportGenerator,
+        queue_size: int = 16,
+        batch_size: int = 1,
+        on_text: Optional[Callable[[AlertEvent, str], None]] = None,
+    ) -> None:
+        self.report_generator = report_generator
+        self.on_text = on_text
+        self.batch_size = max(1, batch_size)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._latest: Tuple[int, str] = (0, "")
+        self._stats: Dict[str, float] = {
+            "submitted": 0,
+            "completed": 0,
+            "batches": 0,
+            "dropped": 0,
+            "failed": 0,
+            "templated": 0,
+        }
+        self._latency_s = 0.0
+
+    def template_text(self, event: AlertEvent) -> str:
+        return "[描述生成中] " + self.report_generator.build_event_prompt(event)
+
+    @property
+    def latest_text(self) -> str:
+        with self._lock:
+            return self._latest[1]
+
+    def start(self) -> "EventNarrator":
+        self._thread = threading.Thread(target=self._run, name="event-narrator", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, event: AlertEvent) -> bool:
+        """Queues ``event`` for narration; returns ``False`` if the queue was full."""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._latest = (seq, self.template_text(event))
+            self._stats["submitted"] += 1
+        if not self.report_generator.llm_client.configured:
+            with self._lock:
+                self._stats["templated"] += 1
+            self._publish(seq, event, f"[模板输出] {self.report_generator.build_event_prompt(event)}")
+            return True
+        try:
+            self._queue.put_nowait((seq, event, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            metrics.inc("llm.narration_dropped")
+            return False
+        metrics.set_gauge("queue.narration", self._queue.qsize())
+        return True
+
+    def _publish(self, seq: int, event: AlertEvent, text: str) -> None:
+        event.extra_info = text
+        with self._lock:
+            # An older narration finishing late must not replace the newest event's text.
+            if self._latest[0] == seq:
+                self._latest = (seq, text)
+        if self.on_text is not None:
+            self.on_text(event, text)
+
+    def _next_batch(self) -> Tuple[list, bool]:
+        """Blocks for one item, then drains whatever else is queued, up to ``batch_size``."""
+        batch = []
+        item = self._queue.get()
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if not batch:
+                continue
+            events = [event for _, event, _ in batch]
+            try:
+                texts = self.report_generator.describe_events(events)
+            except Exception as exc:  # noqa: BLE001
+                with self._lock:
+                    self._stats["failed"] += len(batch)
+                texts = [f"[模板输出] {self.report_generator.build_event_prompt(e)}（描述失败：{exc}）" for e in events]
+            done = time.perf_counter()
+            with self._lock:
+                self._stats["completed"] += len(batch)
+                self._stats["batches"] += 1
+                self._latency_s += sum(done - queued_at for _, _, queued_at in batch)
+            for (seq, event, _), text in zip(batch, texts):
+                self._publish(seq, event, text or self.template_text(event))
+
+    def stop(self, timeout_s: float = 30.0) -> None:
+        """Finishes the queued narrations (up to ``timeout_s``) and stops the worker."""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout_s
+        while True:
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                if time.monotonic() > deadline:
+                    break
+        self._thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._thread = None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            completed = stats["completed"]
+            stats["mean_latency_s"] = self._latency_s / completed if completed else 0.0
+            return stats
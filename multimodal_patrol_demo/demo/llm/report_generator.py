@@ -1,22 +1,30 @@
-from typing import List
+import math
+import re
+from typing import Dict, List, Sequence, Tuple
 
 from demo.llm.llm_client import BaseLLMClient
+from demo.metrics import metrics
 from demo.types import AlertEvent, PatrolReport
 
 
+# "3. ...", "3) ...", "3、..." or "3：..." at the start of a reply line (also used by the stub server).
+NUMBERED_LINE = re.compile(r"^\s*(\d+)\s*[.)、:：]\s*(.+?)\s*$")
+
+
 class ReportGenerator:
     def __init__(self, llm_client: BaseLLMClient) -> None:
         self.llm_client = llm_client
 
     def build_event_prompt(self, event: AlertEvent) -> str:
+        distance = f"距离约 {event.distance_m:.1f} 米" if math.isfinite(event.distance_m) else "距离未知"
         return (
             f"时间：{event.timestamp:.1f} 秒，"
             f"在区域 {event.zone_name} 发现 {event.class_name}，"
-            f"距离约 {event.distance_m:.1f} 米，"
+            f"{distance}，"
             f"在区域内停留约 {event.duration_s:.1f} 秒。"
         )
 
-    def describe_single_event(self, event: AlertEvent) -> str:
+    def _single_event_prompts(self, event: AlertEvent) -> Tuple[str, str]:
         system_prompt = (
             "你是一个智能巡检系统，需要用简洁、专业的中文描述巡检事件。"
             "不要使用第一人称，不要添加未给出的信息。"
@@ -25,12 +33,81 @@ class ReportGenerator:
             "根据以下结构化信息，生成一句话的事件描述：\n"
             + self.build_event_prompt(event)
         )
-        return self.llm_client.generate(system_prompt, user_prompt)
+        return system_prompt, user_prompt
+
+    def describe_single_event(self, event: AlertEvent) -> str:
+        with metrics.timer("llm.describe_event"):
+            return self.llm_client.generate(*self._single_event_prompts(event))
+
+    def describe_events(self, events: List[AlertEvent]) -> List[str]:
+        """Describes several events with one LLM call, returning one sentence per event, in order.
 
-    def summarize_report(self, report: PatrolReport) -> PatrolReport:
+        Lines missing from the reply fall back to the event's template text. Raises if the call fails.
+        """
+        if len(events) <= 1:
+            with metrics.timer("llm.describe_event"):
+                return [self.llm_client.complete(*self._single_event_prompts(e)) for e in events]
+        system_prompt = (
+            "你是一个智能巡检系统，需要用简洁、专业的中文描述巡检事件。"
+            "不要使用第一人称，不要添加未给出的信息。"
+        )
+        numbered = "\n".join(f"{i}. {self.build_event_prompt(e)}" for i, e in enumerate(events, start=1))
+        user_prompt = (
+            f"根据以下 {len(events)} 条结构化信息，为每条生成一句话的事件描述。"
+            "每条输出一行，以相同的编号开头，例如“1. ……”：\n" + numbered
+        )
+        with metrics.timer("llm.describe_events"):
+            reply = self.llm_client.complete(system_prompt, user_prompt)
+        by_number: Dict[int, str] = {}
+        for line in reply.splitlines():
+            match = NUMBERED_LINE.match(line)
+            if match:
+                by_number.setdefault(int(match.group(1)), match.group(2))
+        return [
+            by_number.get(i) or f"[模板输出] {self.build_event_prompt(e)}"
+            for i, e in enumerate(events, start=1)
+        ]
+
+    def summarize_window(self, lines: List[str]) -> str:
+        """Map step of streaming summarisation: a short summary of one window of events. Raises on failure."""
+        system_prompt = (
+            "你是一个智能巡检系统，需要根据一段时间内的事件记录生成阶段小结。"
+            "输出简洁中文，不要超过 80 字，保留时间范围、区域和目标类别等关键信息。"
+        )
+        user_prompt = "以下是巡检中一段时间内记录的事件，请给出阶段小结：\n" + "\n".join(lines)
+        with metrics.timer("llm.summarize_window"):
+            return self.llm_client.complete(system_prompt, user_prompt)
+
+    def merge_summaries(self, summaries: List[str], lines: Sequence[str] = (), final: bool = False) -> str:
+        """Reduce step: merges window summaries (and any not-yet-summarised event lines) into one. Raises on failure."""
+        limit = 120 if final else 80
+        system_prompt = (
+            "你是一个智能巡检系统，需要把多段按时间顺序排列的巡检小结合并为一段"
+            + ("巡检总结。" if final else "更长时段的小结。")
+            + f"输出简洁中文，不要超过 {limit} 字。"
+        )
+        parts = ["以下是本次巡检按时间顺序排列的阶段小结："]
+        parts += [f"{i}. {s}" for i, s in enumerate(summaries, start=1)]
+        if lines:
+            parts.append("以及最近尚未汇总的事件：")
+            parts += list(lines)
+        parts.append("请合并为" + ("总体巡检总结。" if final else "一段阶段小结。"))
+        with metrics.timer("llm.merge_summaries"):
+            return self.llm_client.complete(system_prompt, "\n".join(parts))
+
+    def summarize_report(self, report: PatrolReport, max_events_per_call: int = 50) -> PatrolReport:
         if not report.events:
             report.summary_text = "本次巡检过程中未发现明显异常事件。"
             return report
+        if len(report.events) > max_events_per_call:
+            # Too many lines for one prompt: fold them map-reduce style instead.
+            from demo.llm.summarizer import StreamingSummarizer
+
+            summarizer = StreamingSummarizer(self, window_events=max_events_per_call, background=False)
+            for event in report.events:
+                summarizer.add(event)
+            report.summary_text = summarizer.finish()
+            return report
 
         lines: List[str] = [self.build_event_prompt(e) for e in report.events]
         events_block = "\n".join(lines)
@@ -42,6 +119,7 @@ class ReportGenerator:
         user_prompt = (
             "以下是本次巡检期间记录的事件，请给出总体巡检总结：\n" + events_block
         )
-        summary = self.llm_client.generate(system_prompt, user_prompt)
+        with metrics.timer("llm.summarize"):
+            summary = self.llm_client.generate(system_prompt, user_prompt)
         report.summary_text = summary
         return report
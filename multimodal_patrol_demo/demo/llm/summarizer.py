@@ -0,0 +1,233 @@
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from demo.llm.report_generator import ReportGenerator
+from demo.types import AlertEvent
+
+NO_EVENTS_SUMMARY = "本次巡检过程中未发现明显异常事件。"
+# Cap on fallback (non-LLM) summary text, so failed merges cannot grow without bound.
+_MAX_FALLBACK_CHARS = 400
+
+_STOP = object()
+
+
+@dataclass
+class _Window:
+    start_ts: float
+    end_ts: float
+    lines: List[str] = field(default_factory=list)
+    count: int = 0
+    zones: Counter = field(default_factory=Counter)
+    classes: Counter = field(default_factory=Counter)
+
+    def prompt_lines(self) -> List[str]:
+        lines = list(self.lines)
+        if self.count > len(self.lines):
+            lines.append(
+                f"（另有 {self.count - len(self.lines)} 条事件未逐条列出；本时段按区域计："
+                + "，".join(f"{z} {n} 次" for z, n in self.zones.most_common())
+                + "）"
+            )
+        return lines
+
+    def local_summary(self) -> str:
+        zones = "，".join(f"{z} {n} 次" for z, n in self.zones.most_common(5))
+        classes = "，".join(f"{c} {n} 次" for c, n in self.classes.most_common(5))
+        return f"{self.start_ts:.1f}–{self.end_ts:.1f} 秒：共 {self.count} 个告警事件（区域：{zones}；类别：{classes}）"
+
+
+class StreamingSummarizer:
+    """Folds alert events into a patrol summary incrementally, with bounded memory.
+
+    Events are collected into windows of at most ``window_events`` events or
+    ``window_s`` seconds. Each closed window is summarised by the LLM on a
+    background thread (map); every ``fanout`` summaries of one level are
+    merged into one summary of the next level (reduce). So at most
+    ``fanout - 1`` summaries per level are held, and ``finish`` needs one
+    merge call over those plus the still-open window's lines.
+
+    If the worker falls behind, a window stays open and keeps only counts
+    for further events; if an LLM call fails, a local template summary is
+    used. If ``finish`` times out, windows the worker has not summarised
+    yet get local summaries too (counted as ``timed_out``). With
+    ``background=False`` windows are summarised on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        report_generator: ReportGenerator,
+        window_events: int = 50,
+        window_s: float = 600.0,
+        fanout: int = 4,
+        queue_size: int = 32,
+        background: bool = True,
+    ) -> None:
+        self.report_generator = report_generator
+        self.window_events = max(1, window_events)
+        self.window_s = window_s
+        self.fanout = max(2, fanout)
+        self.background = background
+        self._window: Optional[_Window] = None
+        self._levels: List[List[str]] = []
+        # Guards _levels, _current, _abandoned and _stats, which the worker and finish() share.
+        self._lock = threading.Lock()
+        self._current: Optional[_Window] = None
+        self._abandoned = False
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, int] = {"events": 0, "windows": 0, "merges": 0, "fallbacks": 0, "timed_out": 0}
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def start(self) -> "StreamingSummarizer":
+        if self.background:
+            self._thread = threading.Thread(target=self._run, name="patrol-summarizer", daemon=True)
+            self._thread.start()
+        return self
+
+    def add(self, event: AlertEvent) -> None:
+        window = self._window
+        if window is not None and self.window_s > 0 and event.timestamp - window.start_ts >= self.window_s:
+            self._close_window()
+            window = self._window
+        if window is None:
+            window = self._window = _Window(start_ts=event.timestamp, end_ts=event.timestamp)
+        window.end_ts = event.timestamp
+        window.count += 1
+        window.zones[event.zone_name] += 1
+        window.classes[event.class_name] += 1
+        if len(window.lines) < self.window_events:
+            window.lines.append(self.report_generator.build_event_prompt(event))
+        self._bump("events")
+        if window.count >= self.window_events:
+            self._close_window()
+
+    def _close_window(self) -> None:
+        window = self._window
+        if window is None:
+            return
+        if not self.background:
+            self._fold(0, self._summarize(window), window)
+            self._window = None
+            return
+        try:
+            self._queue.put_nowait(window)
+        except queue.Full:
+            # Worker is behind: keep the window open; beyond window_events it only keeps counts.
+            return
+        self._window = None
+
+    def _summarize(self, window: _Window) -> str:
+        self._bump("windows")
+        try:
+            return self.report_generator.summarize_window(window.prompt_lines())
+        except Exception:  # noqa: BLE001
+            self._bump("fallbacks")
+            return window.local_summary()
+
+    def _merge(self, summaries: List[str]) -> str:
+        self._bump("merges")
+        try:
+            return self.report_generator.merge_summaries(summaries)
+        except Exception:  # noqa: BLE001
+            self._bump("fallbacks")
+            return "；".join(summaries)[:_MAX_FALLBACK_CHARS]
+
+    def _fold(self, level: int, summary: str, window: Optional[_Window] = None) -> None:
+        """Adds a summary at ``level`` and merges full levels upwards.
+
+        Summaries stay in ``_levels`` until their merge has landed, so a
+        ``finish`` that gives up on the worker still sees all of them.
+        """
+        with self._lock:
+            if self._abandoned:
+                return
+            if level == len(self._levels):
+                self._levels.append([])
+            self._levels[level].append(summary)
+            if window is not None:
+                self._current = None
+        while True:
+            with self._lock:
+                if self._abandoned or len(self._levels[level]) < self.fanout:
+                    return
+                group = self._levels[level][: self.fanout]
+            merged = self._merge(group)
+            with self._lock:
+                if self._abandoned:
+                    return
+                del self._levels[level][: self.fanout]
+                if level + 1 == len(self._levels):
+                    self._levels.append([])
+                self._levels[level + 1].append(merged)
+            level += 1
+
+    def _run(self) -> None:
+        while True:
+            window = self._queue.get()
+            if window is _STOP:
+                return
+            with self._lock:
+                if self._abandoned:
+                    return
+                self._current = window
+            self._fold(0, self._summarize(window), window)
+
+    def pending_summaries(self) -> List[str]:
+        """Unmerged summaries in chronological order (higher levels cover earlier time)."""
+        with self._lock:
+            return [s for level in reversed(self._levels) for s in level]
+
+    def _abandon_worker(self) -> List[str]:
+        """Stops using the worker's results and returns local summaries for the windows it still had."""
+        with self._lock:
+            self._abandoned = True
+            unfinished = [self._current] if self._current is not None else []
+        while True:
+            try:
+                window = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if window is not _STOP:
+                unfinished.append(window)
+        self._bump("timed_out", len(unfinished))
+        return [w.local_summary() for w in unfinished]
+
+    def finish(self, call_timeout_s: float = 60.0) -> str:
+        """Waits for queued windows, then merges everything into the final summary with one call.
+
+        The wait allows ``call_timeout_s`` for each queued window and its
+        merges. Windows still unprocessed after that are summarised locally.
+        """
+        late: List[str] = []
+        if self._thread is not None:
+            deadline = time.monotonic() + call_timeout_s * (2 * self._queue.qsize() + 2)
+            try:
+                self._queue.put(_STOP, timeout=call_timeout_s)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            if self._thread.is_alive():
+                late = self._abandon_worker()
+            self._thread = None
+        # Higher levels, then windows the worker did not finish, then the open window: oldest first.
+        summaries = self.pending_summaries() + late
+        tail = self._window.prompt_lines() if self._window is not None else []
+        if not summaries and not tail:
+            return NO_EVENTS_SUMMARY
+        try:
+            return self.report_generator.merge_summaries(summaries, tail, final=True)
+        except Exception:  # noqa: BLE001
+            self._bump("fallbacks")
+            parts = summaries + ([self._window.local_summary()] if self._window is not None else [])
+            return "；".join(parts)[:_MAX_FALLBACK_CHARS]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,217 @@
+"""Lightweight in-process instrumentation: latency histograms, gauges and counters.
+
+Everything goes through the module-level ``metrics`` registry. While it is
+disabled (the default) ``metrics.timer()`` hands back one shared no-op context
+manager and the other calls return after a single flag check.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Log-spaced latency bucket upper bounds in ms, from 10 us to ~2 min.
+_BUCKET_BOUNDS_MS: List[float] = [0.01 * (1.25 ** i) for i in range(74)]
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(_BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q: float) -> float:
+        """Estimates the q-quantile (0..1) by interpolating inside the matching bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= rank:
+                lower = _BUCKET_BOUNDS_MS[i - 1] if i > 0 else 0.0
+                upper = _BUCKET_BOUNDS_MS[i] if i < len(_BUCKET_BOUNDS_MS) else self.max_ms
+                fraction = (rank - cumulative) / n
+                return min(lower + (upper - lower) * fraction, self.max_ms)
+            cumulative += n
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.sum_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+        }
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("_registry", "_name", "_start")
+
+    def __init__(self, registry: "Metrics", name: str) -> None:
+        self._registry = registry
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._registry.observe_ms(self._name, (time.perf_counter() - self._start) * 1000.0)
+        return False
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, float] = {}
+        self._counters: Dict[str, float] = {}
+
+    def timer(self, name: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def observe_ms(self, name: str, value_ms: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.observe(value_ms)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def inc(self, name: str, amount: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._gauges.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "latency": {name: h.summary() for name, h in sorted(self._histograms.items())},
+                "gauges": dict(sorted(self._gauges.items())),
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_prometheus(self, prefix: str = "patrol") -> str:
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_latency_ms Per-stage latency in milliseconds.",
+            f"# TYPE {prefix}_stage_latency_ms summary",
+        ]
+        for name, s in snap["latency"].items():
+            for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{prefix}_stage_latency_ms{{stage="{name}",quantile="{q}"}} {s[key]:.6g}')
+            lines.append(f'{prefix}_stage_latency_ms_sum{{stage="{name}"}} {s["mean_ms"] * s["count"]:.6g}')
+            lines.append(f'{prefix}_stage_latency_ms_count{{stage="{name}"}} {s["count"]}')
+        lines.append(f"# TYPE {prefix}_gauge gauge")
+        for name, value in snap["gauges"].items():
+            lines.append(f'{prefix}_gauge{{name="{name}"}} {value:.6g}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in snap["counters"].items():
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {value:.6g}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsExporter:
+    """Background thread that periodically writes the registry to disk.
+
+    ``jsonl`` appends one JSON snapshot per line; ``prometheus`` atomically
+    rewrites a text-format file for a node_exporter-style textfile scraper.
+    """
+
+    def __init__(self, registry: Metrics, path: str | Path, fmt: str = "jsonl", interval_s: float = 5.0) -> None:
+        if fmt not in ("jsonl", "prometheus"):
+            raise ValueError(f"Unknown metrics format: {fmt}")
+        self.registry = registry
+        self.path = Path(path)
+        self.fmt = fmt
+        self.interval_s = max(0.1, interval_s)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsExporter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.write()
+
+    def write(self) -> None:
+        if self.fmt == "jsonl":
+            snap = self.registry.snapshot()
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(snap, ensure_ascii=False, default=_json_default) + "\n")
+        else:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(self.registry.to_prometheus(), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.write()
+
+
+def _json_default(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return str(value)
+
+
+def configure_metrics(config) -> Optional[MetricsExporter]:
+    """Enables the global registry from a ``MetricsConfig`` and starts its exporter."""
+    metrics.enabled = bool(config.enabled)
+    if not metrics.enabled:
+        return None
+    return MetricsExporter(metrics, config.path, config.format, config.interval_s).start()
@@ -0,0 +1,255 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, List, Optional, Sequence
+
+import cv2
+
+from demo.config import AppConfig
+from demo.data_simulator import DataSimulator
+from demo.fusion.fusion_engine import FusionEngine
+from demo.fusion.preprocess import PointCloudPreprocessor
+from demo.fusion.tracker import MultiObjectTracker
+from demo.fusion.zone_logic import create_zone_monitor
+from demo.inference import InferenceBackend, MicroBatcher, create_backend
+from demo.pipeline import FramePacket, Pipeline, Stage
+from demo.types import AlertEvent, DetectionResult, PatrolReport, RGBFrame, Target3D
+
+# Set in each worker process by _init_worker when inference is centralised.
+_requests: Optional[mp.Queue] = None
+_responses: Optional[List[mp.Queue]] = None
+# Set by _init_worker when the parent consumes events as they are raised.
+_events: Optional[mp.Queue] = None
+
+EventCallback = Callable[[AlertEvent, Optional[Sequence[Target3D]]], None]
+
+
+@dataclass
+class StreamResult:
+    name: str
+    frames: int
+    wall_s: float
+    first_ts: Optional[float] = None
+    last_ts: Optional[float] = None
+    events: int = 0
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.wall_s if self.wall_s > 0 else 0.0
+
+
+def _init_worker(
+    requests: Optional[mp.Queue], responses: Optional[List[mp.Queue]], events: Optional[mp.Queue]
+) -> None:
+    global _requests, _responses, _events
+    _requests = requests
+    _responses = responses
+    _events = events
+    # One process per stream already uses the cores; keep OpenCV from oversubscribing them.
+    cv2.setNumThreads(1)
+
+
+class RemoteBackend(InferenceBackend):
+    """Worker-side backend that forwards frames to the parent's shared inference server.
+
+    Only the RGB frame crosses the process boundary (point clouds stay in the
+    worker), but it is pickled through a pipe: about width x height x 3 bytes
+    per frame, which bounds central-mode throughput at high resolutions.
+    """
+
+    def __init__(self, stream_index: int) -> None:
+        self.stream_index = stream_index
+
+    def load(self):
+        if _requests is None or _responses is None:
+            raise RuntimeError("Central inference queues are not initialised in this process")
+
+    def infer(self, frame: RGBFrame) -> DetectionResult:
+        _requests.put((self.stream_index, frame))
+        result = _responses[self.stream_index].get()
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+class InferenceServer:
+    """Parent-side loop feeding requests from all workers into one MicroBatcher."""
+
+    def __init__(self, backend: InferenceBackend, config: AppConfig, requests: mp.Queue, responses: List[mp.Queue]):
+        self.batcher = MicroBatcher(
+            backend, max(config.model.batch_size, len(responses)), config.model.max_batch_wait_ms
+        )
+        self.requests = requests
+        self.responses = responses
+        self._thread = threading.Thread(target=self._run, name="inference-server", daemon=True)
+        self._stop = threading.Event()
+
+    def start(self) -> "InferenceServer":
+        self.batcher.start()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        self.batcher.stop()
+
+    def _reply(self, stream_index: int, future) -> None:
+        try:
+            self.responses[stream_index].put(future.result())
+        except BaseException as exc:  # noqa: BLE001
+            self.responses[stream_index].put(exc)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                stream_index, frame = self.requests.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            future = self.batcher.submit(frame)
+            future.add_done_callback(lambda f, i=stream_index: self._reply(i, f))
+
+
+def run_stream(stream_index: int, config: AppConfig, central: bool) -> StreamResult:
+    """Runs one sequence's load/preprocess/infer/fuse/zone pipeline as fast as possible."""
+    name = config.streams[stream_index].name
+    simulator = DataSimulator(config.streams[stream_index].demo)
+    if central:
+        backend: InferenceBackend = RemoteBackend(stream_index)
+    else:
+        backend = create_backend(config.model)
+    backend.load()
+
+    preprocessor = PointCloudPreprocessor(config.preprocess)
+    fusion_engine = FusionEngine(config.fusion)
+    tracker = MultiObjectTracker(config.tracker.iou_threshold, config.tracker.max_age_s)
+    zone_monitor = create_zone_monitor(config.fusion, config.alert)
+
+    def load_frames():
+        for index, (rgb_frame, pcd_frame) in enumerate(simulator.iter_frames()):
+            yield FramePacket(index=index, rgb=rgb_frame, pcd=pcd_frame)
+
+    def preprocess_stage(packet: FramePacket) -> FramePacket:
+        packet.pcd = preprocessor.process(packet.pcd)
+        return packet
+
+    def infer_stage(packet: FramePacket) -> FramePacket:
+        packet.det = backend.infer(packet.rgb)
+        return packet
+
+    def fuse_stage(packet: FramePacket) -> FramePacket:
+        packet.targets = fusion_engine.fuse(packet.det, packet.pcd, packet.rgb.image.shape[:2])
+        tracker.update(packet.targets, packet.rgb.timestamp)
+        packet.alert, packet.events = zone_monitor.update(packet.targets, packet.rgb.timestamp)
+        return packet
+
+    pipeline = Pipeline(
+        [
+            Stage("preprocess", preprocess_stage),
+            Stage("infer", infer_stage),
+            Stage("fuse", fuse_stage),
+        ],
+        queue_size=config.pipeline.queue_size,
+    )
+    result = StreamResult(name=name, frames=0, wall_s=0.0)
+    start = time.perf_counter()
+    for packet in pipeline.run(load_frames()):
+        if result.first_ts is None:
+            result.first_ts = packet.rgb.timestamp
+        result.last_ts = packet.rgb.timestamp
+        result.frames += 1
+        for event in packet.events:
+            event.stream_name = name
+            if _events is not None:
+                # Sent to the parent as raised, so no process holds a whole patrol's events.
+                _events.put((event, packet.targets if config.event_store.store_targets else None))
+            result.events += 1
+    result.wall_s = time.perf_counter() - start
+    simulator.close()
+    return result
+
+
+def _worker_config(config: AppConfig, workers: int) -> AppConfig:
+    if config.model.num_threads > 0:
+        return config
+    # Split the cores between replicated backends instead of letting each grab all of them.
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    return replace(config, model=replace(config.model, num_threads=threads))
+
+
+def _forward_events(events: mp.Queue, on_event: EventCallback) -> None:
+    while True:
+        item = events.get()
+        if item is None:
+            break
+        on_event(*item)
+
+
+def run_streams(
+    config: AppConfig, on_event: Optional[EventCallback] = None
+) -> tuple[PatrolReport, List[StreamResult]]:
+    """Runs every configured stream in a process pool.
+
+    Events from all streams are passed to ``on_event(event, targets)`` on one
+    parent thread as they are raised (``targets`` only with
+    ``event_store.store_targets``); the returned report holds the patrol's
+    time span, not the events.
+    """
+    if not config.streams:
+        raise ValueError("No streams configured; add a `streams` list to config.yaml")
+    mode = config.multistream.inference.lower()
+    if mode not in ("replicated", "central"):
+        raise ValueError(f"Unknown multistream.inference mode: {config.multistream.inference}")
+    central = mode == "central"
+    workers = config.multistream.workers or min(len(config.streams), os.cpu_count() or 1)
+
+    ctx = mp.get_context("spawn")
+    requests = ctx.Queue() if central else None
+    responses = [ctx.Queue() for _ in config.streams] if central else None
+    events = ctx.Queue() if on_event is not None else None
+    forwarder: Optional[threading.Thread] = None
+    if events is not None:
+        forwarder = threading.Thread(
+            target=_forward_events, args=(events, on_event), name="stream-events", daemon=True
+        )
+        forwarder.start()
+    server: Optional[InferenceServer] = None
+    if central:
+        backend = create_backend(config.model)
+        backend.load()
+        server = InferenceServer(backend, config, requests, responses).start()
+        worker_config = config
+    else:
+        worker_config = _worker_config(config, workers)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(requests, responses, events),
+        ) as pool:
+            futures = [
+                pool.submit(run_stream, i, worker_config, central) for i in range(len(config.streams))
+            ]
+            results = [f.result() for f in futures]
+    finally:
+        if server is not None:
+            server.stop()
+        if forwarder is not None:
+            # Workers have exited, so every event is already in the queue ahead of this.
+            events.put(None)
+            forwarder.join()
+
+    first = [r.first_ts for r in results if r.first_ts is not None]
+    last = [r.last_ts for r in results if r.last_ts is not None]
+    report = PatrolReport(
+        events=[],
+        start_time=min(first) if first else 0.0,
+        end_time=max(last) if last else 0.0,
+    )
+    return report, results
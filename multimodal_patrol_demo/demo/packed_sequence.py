@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+POINTS_FILE = "points.npy"
+OFFSETS_FILE = "offsets.npy"
+TIMESTAMPS_FILE = "timestamps.npy"
+
+# KITTI velodyne scans are flat float32 records of (x, y, z, reflectance).
+KITTI_POINT_STRIDE = 4
+
+
+def _kitti_bin_point_count(path: Path) -> int:
+    return path.stat().st_size // (KITTI_POINT_STRIDE * np.dtype(np.float32).itemsize)
+
+
+def write_packed_sequence(
+    output_dir: str | Path,
+    pointcloud_files: Sequence[Path],
+    timestamps: Sequence[float],
+) -> Path:
+    """Packs KITTI ``.bin`` scans into one contiguous (N, 3) float32 buffer.
+
+    Layout of ``output_dir``:
+        points.npy      all xyz points of all frames, back to back
+        offsets.npy     int64, frame ``i`` is ``points[offsets[i]:offsets[i + 1]]``
+        timestamps.npy  float64 timestamp per frame
+    """
+
+    if len(pointcloud_files) != len(timestamps):
+        raise ValueError(
+            f"Point clouds and timestamps mismatch: {len(pointcloud_files)} vs {len(timestamps)}"
+        )
+    for path in pointcloud_files:
+        if Path(path).suffix.lower() != ".bin":
+            raise ValueError(f"Packed format only supports KITTI .bin scans: {path}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    counts = np.array([_kitti_bin_point_count(Path(p)) for p in pointcloud_files], dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    points = np.lib.format.open_memmap(
+        output_dir / POINTS_FILE, mode="w+", dtype=np.float32, shape=(int(offsets[-1]), 3)
+    )
+    for i, path in enumerate(pointcloud_files):
+        raw = np.fromfile(path, dtype=np.float32).reshape(-1, KITTI_POINT_STRIDE)
+        points[offsets[i] : offsets[i + 1]] = raw[:, :3]
+    points.flush()
+    del points
+
+    np.save(output_dir / OFFSETS_FILE, offsets)
+    np.save(output_dir / TIMESTAMPS_FILE, np.asarray(timestamps, dtype=np.float64))
+    return output_dir
+
+
+class PackedSequence:
+    """Read-only, memory-mapped view of a sequence written by ``write_packed_sequence``."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        for name in (POINTS_FILE, OFFSETS_FILE, TIMESTAMPS_FILE):
+            if not (self.root / name).exists():
+                raise FileNotFoundError(f"Missing packed sequence file: {self.root / name}")
+        self.points = np.load(self.root / POINTS_FILE, mmap_mode="r")
+        self.offsets = np.load(self.root / OFFSETS_FILE)
+        self.timestamps = np.load(self.root / TIMESTAMPS_FILE)
+        if len(self.offsets) != len(self.timestamps) + 1:
+            raise ValueError(
+                f"Corrupt packed sequence {self.root}: {len(self.offsets)} offsets"
+                f" for {len(self.timestamps)} timestamps"
+            )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def points_at(self, index: int) -> np.ndarray:
+        # Slicing a memmap returns a view; pages are only read when touched.
+        return self.points[self.offsets[index] : self.offsets[index + 1]]
@@ -0,0 +1,162 @@
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from demo.metrics import metrics
+from demo.types import AlertEvent, DetectionResult, PointCloudFrame, RGBFrame, Target3D
+
+_END = object()
+
+
+@dataclass
+class FramePacket:
+    index: int
+    rgb: RGBFrame
+    pcd: PointCloudFrame
+    det: Optional[DetectionResult] = None
+    det_future: Optional[Future] = None
+    targets: List[Target3D] = field(default_factory=list)
+    alert: bool = False
+    events: List[AlertEvent] = field(default_factory=list)
+    event_text: str = ""
+
+    def detections(self) -> DetectionResult:
+        """Returns ``det``, waiting for a pending micro-batched inference if needed."""
+        if self.det is None and self.det_future is not None:
+            self.det = self.det_future.result()
+            self.det_future = None
+        return self.det
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Any]
+
+
+class Pipeline:
+    """Runs each stage on its own worker thread, joined by bounded queues.
+
+    Every stage has exactly one worker, so items reach the consumer in the
+    order the source produced them. A full queue blocks the upstream stage
+    (backpressure); a stage returning ``None`` drops the item. With metrics
+    enabled, each stage's latency and input queue depth are recorded as
+    ``stage.<name>`` and ``queue.<name>``.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4) -> None:
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self._queues: List[queue.Queue] = []
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_stage = ""
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, stage_name: str, exc: BaseException) -> None:
+        if self._error is None:
+            self._error = exc
+            self._error_stage = stage_name
+        self._stop.set()
+
+    def _run_source(self, source: Iterable[Any], out_q: queue.Queue) -> None:
+        try:
+            for item in source:
+                if not self._put(out_q, item):
+                    return
+        except BaseException as exc:  # noqa: BLE001
+            self._fail("source", exc)
+            return
+        self._put(out_q, _END)
+
+    def _run_stage(self, stage: Stage, in_q: queue.Queue, out_q: queue.Queue) -> None:
+        while True:
+            item = self._get(in_q)
+            if item is _END:
+                break
+            metrics.set_gauge(f"queue.{stage.name}", in_q.qsize())
+            try:
+                with metrics.timer(f"stage.{stage.name}"):
+                    result = stage.fn(item)
+            except BaseException as exc:  # noqa: BLE001
+                self._fail(stage.name, exc)
+                return
+            if result is None:
+                metrics.inc("frames_dropped")
+                metrics.inc(f"frames_dropped.{stage.name}")
+            elif not self._put(out_q, result):
+                return
+        self._put(out_q, _END)
+
+    def _start(self, source: Iterable[Any]) -> queue.Queue:
+        self._stop.clear()
+        self._error = None
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        self._threads = [
+            threading.Thread(
+                target=self._run_source, args=(source, self._queues[0]), name="pipeline-source", daemon=True
+            )
+        ]
+        for i, stage in enumerate(self.stages):
+            self._threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, self._queues[i], self._queues[i + 1]),
+                    name=f"pipeline-{stage.name}",
+                    daemon=True,
+                )
+            )
+        for t in self._threads:
+            t.start()
+        return self._queues[-1]
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        """Yields the output of the last stage on the calling thread.
+
+        Breaking out of the loop (or closing the generator) stops all workers.
+        """
+
+        out_q = self._start(source)
+        try:
+            while True:
+                item = self._get(out_q)
+                if item is _END:
+                    break
+                yield item
+        finally:
+            self.stop()
+        if self._error is not None:
+            raise RuntimeError(f"Pipeline stage '{self._error_stage}' failed") from self._error
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current size of each stage's input queue plus the consumer's ``output`` queue."""
+        if not self._queues:
+            return {}
+        names = [stage.name for stage in self.stages] + ["output"]
+        return {name: q.qsize() for name, q in zip(names, self._queues)}
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        self._stop.set()
+        for t in self._threads:
+            if t is not threading.current_thread():
+                t.join(timeout=timeout_s)
+        self._threads = []
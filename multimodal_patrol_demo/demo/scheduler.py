@@ -0,0 +1,157 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from demo.metrics import metrics
+from demo.time_utils import get_play_interval
+
+DROP_POLICIES = ("none", "drop", "skip")
+
+
+class PlaybackScheduler:
+    """Paces playback against the frames' recorded timestamps on a monotonic clock.
+
+    The first frame passed to ``wait`` anchors media time to wall time; every
+    later frame is due at ``anchor + (timestamp - first_timestamp) / speed``.
+    ``wait`` sleeps only for what is left of that budget, so processing time is
+    absorbed instead of added on top. A frame more than ``max_lag_s`` late is
+    handled by ``policy``:
+
+    - ``"none"``: shown anyway; playback runs late until processing catches up.
+    - ``"drop"``: processed, but not shown (``wait`` returns ``False``), and
+      media time is re-anchored at that frame so the next one is judged
+      against now. Under sustained overload playback falls behind the
+      recording but at most every other frame is dropped; the display never
+      freezes. This only saves display time, not processing.
+    - ``"skip"``: as ``"drop"``, and ``should_skip`` additionally lets the
+      source skip loading stale frames, which sheds load upstream.
+
+    With ``frame_interval_s > 0`` frames are paced at that fixed interval by
+    index instead (see ``media_time``).
+    """
+
+    def __init__(
+        self,
+        speed: float = 1.0,
+        policy: str = "drop",
+        max_lag_s: float = 0.1,
+        frame_interval_s: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy} (expected one of {DROP_POLICIES})")
+        if speed <= 0:
+            raise ValueError("Playback speed must be positive")
+        self.speed = speed
+        self.policy = policy
+        self.max_lag_s = max_lag_s
+        self.frame_interval_s = frame_interval_s
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._anchor_wall: Optional[float] = None
+        self._anchor_ts = 0.0
+        self._paused_at: Optional[float] = None
+        self.shown = 0
+        self.dropped = 0
+        self.skipped = 0
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def media_time(self, index: int, timestamp: float) -> float:
+        """Playback position of a frame: its recorded timestamp, or ``index * frame_interval_s``."""
+        return index * self.frame_interval_s if self.frame_interval_s > 0 else timestamp
+
+    def _media_time(self, now: float) -> float:
+        if self._paused_at is not None:
+            now = self._paused_at
+        return self._anchor_ts + (now - self._anchor_wall) * self.speed
+
+    def _lag_s(self, timestamp: float, now: float) -> float:
+        """Wall-clock seconds the frame is overdue; negative while it is early."""
+        return (self._media_time(now) - timestamp) / self.speed
+
+    def wait(self, timestamp: float) -> bool:
+        """Blocks until the frame is due. Returns ``False`` if it should be dropped instead of shown."""
+        with self._lock:
+            now = self._clock()
+            if self._anchor_wall is None:
+                self._anchor_wall, self._anchor_ts = now, timestamp
+                self.shown += 1
+                return True
+            lag = self._lag_s(timestamp, now)
+            if lag > self.max_lag_s and self.policy != "none":
+                self.dropped += 1
+                # Without re-anchoring, a pipeline slower than real time would drop every later frame.
+                self._anchor_wall, self._anchor_ts = now, timestamp
+                metrics.inc("frames_dropped")
+                metrics.inc("playback.dropped")
+                return False
+            self.shown += 1
+        if lag < 0:
+            self._sleep(-lag)
+        return True
+
+    def should_skip(self, timestamp: float) -> bool:
+        """Source-side check: with the ``skip`` policy, whether a frame is already too late to load."""
+        if self.policy != "skip":
+            return False
+        with self._lock:
+            if self._anchor_wall is None or self._paused_at is not None:
+                return False
+            if self._lag_s(timestamp, self._clock()) <= self.max_lag_s:
+                return False
+            self.skipped += 1
+            metrics.inc("frames_dropped")
+            metrics.inc("playback.skipped")
+            return True
+
+    def pause(self) -> None:
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = self._clock()
+
+    def resume(self) -> None:
+        with self._lock:
+            if self._paused_at is None:
+                return
+            if self._anchor_wall is not None:
+                # Shift the anchor so the paused span does not count as lag.
+                self._anchor_wall += self._clock() - self._paused_at
+            self._paused_at = None
+
+    def set_speed(self, speed: float) -> None:
+        if speed <= 0:
+            raise ValueError("Playback speed must be positive")
+        with self._lock:
+            if self._anchor_wall is not None:
+                # Re-anchor at the current media time so the change applies from now on.
+                now = self._paused_at if self._paused_at is not None else self._clock()
+                self._anchor_ts = self._media_time(now)
+                self._anchor_wall = now
+            self.speed = speed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"shown": self.shown, "dropped": self.dropped, "skipped": self.skipped}
+
+
+def create_scheduler(demo_config) -> Optional[PlaybackScheduler]:
+    """Builds the scheduler for ``demo.pacing``; ``None`` means unthrottled playback."""
+    pacing = demo_config.pacing.lower()
+    if pacing not in ("timestamps", "fps"):
+        raise ValueError(f"Unknown demo.pacing: {demo_config.pacing}")
+    frame_interval_s = 0.0
+    if pacing == "fps":
+        frame_interval_s = get_play_interval(demo_config.play_fps)
+        if frame_interval_s <= 0:
+            return None
+    return PlaybackScheduler(
+        speed=demo_config.playback_speed,
+        policy=demo_config.drop_policy,
+        max_lag_s=demo_config.max_lag_s,
+        frame_interval_s=frame_interval_s,
+    )
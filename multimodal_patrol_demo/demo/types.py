@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
 
 import numpy as np
 
@@ -26,8 +26,86 @@ class Detection:
 
 @dataclass
 class DetectionResult:
-    detections: List[Detection]
+    """Struct-of-arrays detections of one frame.
+
+    ``boxes`` is (N, 4) xyxy float32, ``scores`` (N,) float32 and ``class_ids``
+    (N,) int64 indexing the shared ``class_names`` table. ``detections`` offers
+    the per-object ``Detection`` view, built lazily on first access.
+    """
+
+    boxes: np.ndarray
+    scores: np.ndarray
+    class_ids: np.ndarray
+    class_names: Sequence[str]
     timestamp: float
+    _detections: Optional[List[Detection]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.boxes = np.asarray(self.boxes, dtype=np.float32).reshape(-1, 4)
+        self.scores = np.asarray(self.scores, dtype=np.float32).reshape(-1)
+        self.class_ids = np.asarray(self.class_ids, dtype=np.int64).reshape(-1)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @classmethod
+    def empty(cls, timestamp: float, class_names: Sequence[str] = ()) -> "DetectionResult":
+        return cls(
+            boxes=np.zeros((0, 4), dtype=np.float32),
+            scores=np.zeros((0,), dtype=np.float32),
+            class_ids=np.zeros((0,), dtype=np.int64),
+            class_names=class_names,
+            timestamp=timestamp,
+        )
+
+    @classmethod
+    def from_detections(cls, detections: List[Detection], timestamp: float) -> "DetectionResult":
+        if not detections:
+            return cls.empty(timestamp)
+        table = {}
+        for d in detections:
+            table.setdefault(d.class_id, d.class_name)
+        names = [str(i) for i in range(max(table) + 1)]
+        for class_id, name in table.items():
+            names[class_id] = name
+        return cls(
+            boxes=np.stack([d.bbox_xyxy for d in detections]),
+            scores=np.array([d.confidence for d in detections]),
+            class_ids=np.array([d.class_id for d in detections]),
+            class_names=names,
+            timestamp=timestamp,
+        )
+
+    def class_name_of(self, class_id: int) -> str:
+        return self.class_names[class_id] if 0 <= class_id < len(self.class_names) else str(class_id)
+
+    def labels(self) -> List[str]:
+        """Class name of each detection, in order."""
+        return [self.class_name_of(c) for c in self.class_ids.tolist()]
+
+    def select(self, mask: np.ndarray) -> "DetectionResult":
+        """Subset by boolean mask or index array, sharing the class table."""
+        return DetectionResult(
+            boxes=self.boxes[mask],
+            scores=self.scores[mask],
+            class_ids=self.class_ids[mask],
+            class_names=self.class_names,
+            timestamp=self.timestamp,
+        )
+
+    @property
+    def detections(self) -> List[Detection]:
+        if self._detections is None:
+            self._detections = [
+                Detection(
+                    class_id=int(c),
+                    class_name=self.class_name_of(int(c)),
+                    confidence=float(s),
+                    bbox_xyxy=b,
+                )
+                for b, s, c in zip(self.boxes, self.scores, self.class_ids)
+            ]
+        return self._detections
 
 
 @dataclass
@@ -37,6 +115,8 @@ class Target3D:
     in_danger_zone: bool
     bbox_xyxy: np.ndarray
     timestamp: float
+    track_id: Optional[int] = None
+    zones: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -47,6 +127,10 @@ class AlertEvent:
     zone_name: str
     duration_s: float
     extra_info: Optional[str] = None
+    track_id: Optional[int] = None
+    stream_name: Optional[str] = None
+    # Assigned by the event store.
+    event_id: Optional[str] = None
 
 
 @dataclass
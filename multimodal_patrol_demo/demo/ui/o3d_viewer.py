@@ -1,17 +1,55 @@
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional
 
 import numpy as np
 import open3d as o3d
 
+from demo.metrics import metrics
 from demo.types import PointCloudFrame
 
+# How often the viewer thread services window events while idle.
+POLL_INTERVAL_S = 0.05
+
 
 class PointCloudView:
-    def __init__(self, window_name: str = "PointCloud View") -> None:
+    """Shows the latest point cloud, decoupled from the processing rate.
+
+    With ``threaded=True`` the Open3D window is created and driven entirely
+    on its own thread: ``render`` only replaces a latest-frame slot and
+    returns, and the thread redraws at most ``max_fps`` times per second,
+    skipping frames that were superseded in between. Clouds larger than
+    ``max_points`` are subsampled for display at evenly spaced indices.
+    Every cloud is shown as exactly ``max_points`` points: smaller ones are
+    padded by repeating their last point. So Open3D's float64 point buffer
+    is allocated once and then overwritten in place. With ``threaded=False`` the same drawing runs on the caller's
+    thread (needed where GL windows must live on the main thread, e.g. macOS).
+    """
+
+    def __init__(
+        self,
+        window_name: str = "PointCloud View",
+        max_fps: float = 10.0,
+        max_points: int = 60000,
+        threaded: bool = True,
+    ) -> None:
         self.window_name = window_name
+        self.min_interval_s = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.max_points = max_points
+        self.threaded = threaded
         self.vis: Optional[o3d.visualization.Visualizer] = None
         self.pcd: Optional[o3d.geometry.PointCloud] = None
         self.initialized = False
+        self._pending: Optional[PointCloudFrame] = None
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._last_draw = 0.0
+        # arange(max_points), scaled in place to each cloud's size: no per-frame allocation.
+        self._base_index = np.arange(max(0, max_points), dtype=np.intp)
+        self._index = np.empty_like(self._base_index)
+        self._gather: Optional[np.ndarray] = None
+        self._stats = {"submitted": 0, "drawn": 0, "superseded": 0}
 
     def _init_vis(self):
         self.vis = o3d.visualization.Visualizer()
@@ -21,10 +59,107 @@ class PointCloudView:
         self.initialized = True
 
     def render(self, pcd_frame: PointCloudFrame):
+        if not self.threaded:
+            with self._cond:
+                self._stats["submitted"] += 1
+            if self.initialized and time.perf_counter() - self._last_draw < self.min_interval_s:
+                with self._cond:
+                    self._stats["superseded"] += 1
+                self._poll()
+                return
+            self._draw(pcd_frame)
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pcd-view", daemon=True)
+            self._thread.start()
+        with self._cond:
+            if self._pending is not None:
+                self._stats["superseded"] += 1
+                metrics.inc("ui.pcd_superseded")
+            self._pending = pcd_frame
+            self._stats["submitted"] += 1
+            self._cond.notify()
+
+    def _display_indices(self, n: int) -> np.ndarray:
+        if n > self.max_points:
+            # Evenly spaced over the scan (floor(i * n / max_points)); scans are usually ordered by ring/azimuth.
+            np.multiply(self._base_index, n, out=self._index)
+            np.floor_divide(self._index, self.max_points, out=self._index)
+        else:
+            # Pad by repeating the last point; duplicates draw on top of each other.
+            np.minimum(self._base_index, n - 1, out=self._index)
+        return self._index
+
+    def _update_points(self, points: np.ndarray) -> None:
+        assert self.pcd is not None
+        if self.max_points <= 0:
+            # No fixed display size: the buffer follows the cloud's size.
+            self.pcd.points = o3d.utility.Vector3dVector(np.asarray(points, dtype=np.float64))
+            return
+        current = np.asarray(self.pcd.points)
+        if current.shape != (self.max_points, 3):
+            self.pcd.points = o3d.utility.Vector3dVector(np.zeros((self.max_points, 3)))
+            current = np.asarray(self.pcd.points)
+        if len(points) == 0:
+            current[:] = 0.0
+            return
+        if self._gather is None or self._gather.dtype != points.dtype:
+            # Fixed-size gather buffer in the cloud's dtype (take() cannot cast); reallocated only on a dtype change.
+            self._gather = np.empty((self.max_points, 3), dtype=points.dtype)
+        np.take(points, self._display_indices(len(points)), axis=0, out=self._gather)
+        np.copyto(current, self._gather)
+
+    def _draw(self, pcd_frame: PointCloudFrame) -> None:
         if not self.initialized:
             self._init_vis()
         assert self.pcd is not None and self.vis is not None
-        self.pcd.points = o3d.utility.Vector3dVector(pcd_frame.points.astype(np.float64))
-        self.vis.update_geometry(self.pcd)
-        self.vis.poll_events()
-        self.vis.update_renderer()
+        with metrics.timer("ui.pcd_render"):
+            self._update_points(pcd_frame.points)
+            self.vis.update_geometry(self.pcd)
+            self.vis.poll_events()
+            self.vis.update_renderer()
+        self._last_draw = time.perf_counter()
+        with self._cond:
+            self._stats["drawn"] += 1
+
+    def _poll(self) -> None:
+        # Window events only (move, zoom, close); Open3D redraws by itself when the view changes.
+        if self.vis is not None:
+            self.vis.poll_events()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                wait_s = self.min_interval_s - (time.perf_counter() - self._last_draw)
+                if self._pending is None:
+                    wait_s = POLL_INTERVAL_S
+                if wait_s > 0 and not self._stopping:
+                    # Wakes early on a new frame; otherwise services window events while waiting.
+                    self._cond.wait(timeout=min(wait_s, POLL_INTERVAL_S))
+                if self._stopping:
+                    break
+                frame = None
+                if self._pending is not None and time.perf_counter() - self._last_draw >= self.min_interval_s:
+                    frame, self._pending = self._pending, None
+            if frame is not None:
+                self._draw(frame)
+            else:
+                self._poll()
+        if self.vis is not None:
+            self.vis.destroy_window()
+
+    def close(self, timeout_s: float = 2.0) -> None:
+        if self._thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            self._thread.join(timeout=timeout_s)
+            self._thread = None
+        elif self.vis is not None:
+            self.vis.destroy_window()
+        self.vis = None
+        self.initialized = False
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return dict(self._stats)
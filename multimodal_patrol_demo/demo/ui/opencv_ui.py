@@ -1,21 +1,86 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from demo.fusion.zone_mask import zone_polygon_pixels
+from demo.metrics import metrics
 from demo.types import DetectionResult, RGBFrame, Target3D
 
 
 class RGBView:
-    def __init__(self, config) -> None:
+    """Draws detections, targets, zones and alert state over the RGB frame.
+
+    With ``offscreen=True`` nothing is shown; ``render`` just returns the
+    annotated canvas (benchmarks, recording, display-less runs).
+
+    The canvas is one buffer reused across frames, so callers that keep it
+    past the next ``render`` must copy it. Zone outlines are rasterized once
+    per canvas size and the event banner once per text; per frame only their
+    pixels (outlines) or strip (banner) are blended in. With
+    ``ui.display_scale`` < 1 the frame is drawn at that reduced size.
+    """
+
+    def __init__(self, config, offscreen: bool = False) -> None:
         self.config = config
         self.window_name = config.ui.window_name_rgb
+        self.offscreen = offscreen
+        self.display_scale = float(getattr(config.ui, "display_scale", 1.0))
+        self._canvas: Optional[np.ndarray] = None
+        self._zone_layers: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._banner: Optional[Tuple[tuple, np.ndarray]] = None
+
+    def _canvas_for(self, image: np.ndarray) -> np.ndarray:
+        h, w = image.shape[:2]
+        if 0 < self.display_scale < 1.0:
+            h, w = max(1, round(h * self.display_scale)), max(1, round(w * self.display_scale))
+        if self._canvas is None or self._canvas.shape != (h, w, image.shape[2]) or self._canvas.dtype != image.dtype:
+            self._canvas = np.empty((h, w, image.shape[2]), dtype=image.dtype)
+        if (h, w) == image.shape[:2]:
+            np.copyto(self._canvas, image)
+        else:
+            cv2.resize(image, (w, h), dst=self._canvas, interpolation=cv2.INTER_AREA)
+        return self._canvas
 
-    def _draw_detections(self, img: np.ndarray, det: DetectionResult):
-        for d in det.detections:
-            x1, y1, x2, y2 = d.bbox_xyxy.astype(int)
+    def _zone_layer(self, shape) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Outline pixels of all zones for ``shape``: flat indices, premultiplied colours, alpha."""
+        key = (int(shape[0]), int(shape[1]))
+        layer = self._zone_layers.get(key)
+        if layer is None:
+            color = np.zeros((key[0], key[1], 3), dtype=np.uint8)
+            alpha = np.zeros(key, dtype=np.uint8)
+            for img, c in ((color, (0, 165, 255)), (alpha, 255)):
+                for zone in self.config.fusion.zones:
+                    pts = zone_polygon_pixels(zone.polygon, key)
+                    cv2.polylines(img, [pts], True, c, self.config.ui.line_thickness)
+                    x, y = pts.min(axis=0)
+                    cv2.putText(
+                        img,
+                        zone.name,
+                        (int(x) + 5, int(y) + 20),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        self.config.ui.font_scale,
+                        c,
+                        self.config.ui.line_thickness,
+                        lineType=cv2.LINE_AA,
+                    )
+            idx = np.flatnonzero(alpha)
+            a = (alpha.reshape(-1)[idx].astype(np.float32) / 255.0)[:, None]
+            # Anti-aliased edges were drawn over black, so the colour layer is already premultiplied.
+            layer = (idx, color.reshape(-1, 3)[idx].astype(np.float32), 1.0 - a)
+            self._zone_layers[key] = layer
+        return layer
+
+    def _draw_zones(self, img: np.ndarray):
+        idx, color, inv_alpha = self._zone_layer(img.shape)
+        flat = img.reshape(-1, img.shape[2])
+        flat[idx] = (flat[idx] * inv_alpha + color).astype(np.uint8)
+
+    def _draw_detections(self, img: np.ndarray, det: DetectionResult, scale: float = 1.0):
+        boxes = (det.boxes * scale).astype(int).tolist()
+        for (x1, y1, x2, y2), name, score in zip(boxes, det.labels(), det.scores.tolist()):
             cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), self.config.ui.line_thickness)
-            label = f"{d.class_name} {d.confidence:.2f}"
+            label = f"{name} {score:.2f}"
             cv2.putText(
                 img,
                 label,
@@ -27,12 +92,14 @@ class RGBView:
                 lineType=cv2.LINE_AA,
             )
 
-    def _draw_targets(self, img: np.ndarray, targets: List[Target3D]):
+    def _draw_targets(self, img: np.ndarray, targets: List[Target3D], scale: float = 1.0):
         for t in targets:
-            x1, y1, x2, y2 = t.bbox_xyxy.astype(int)
+            x1, y1, x2, y2 = (t.bbox_xyxy * scale).astype(int)
             color = (0, 0, 255) if t.in_danger_zone else (255, 255, 0)
             cv2.rectangle(img, (x1, y1), (x2, y2), color, self.config.ui.line_thickness)
-            label = f"{t.class_name} {t.distance_m:.1f}m"
+            # NaN when no LiDAR point fell inside the box.
+            distance = f"{t.distance_m:.1f}m" if np.isfinite(t.distance_m) else "--m"
+            label = f"{t.class_name} {distance}"
             cv2.putText(
                 img,
                 label,
@@ -58,36 +125,38 @@ class RGBView:
             lineType=cv2.LINE_AA,
         )
 
-    def _draw_event_text(self, img: np.ndarray, event_text: str):
-        if not event_text:
-            return
+    def _banner_strip(self, width: int, height: int, event_text: str) -> np.ndarray:
+        key = (event_text, width, height, self.config.ui.font_scale, self.config.ui.line_thickness)
+        if self._banner is not None and self._banner[0] == key:
+            return self._banner[1]
         margin = 10
-        overlay = img.copy()
         text_size, _ = cv2.getTextSize(
             event_text,
             cv2.FONT_HERSHEY_SIMPLEX,
             self.config.ui.font_scale,
             max(1, self.config.ui.line_thickness),
         )
-        text_height = text_size[1] + 2 * margin
-        cv2.rectangle(
-            overlay,
-            (0, img.shape[0] - text_height),
-            (img.shape[1], img.shape[0]),
-            (255, 255, 255),
-            -1,
-        )
+        strip_height = min(height, text_size[1] + 2 * margin)
+        strip = np.full((strip_height, width, 3), 255, dtype=np.uint8)
         cv2.putText(
-            overlay,
+            strip,
             event_text,
-            (margin, img.shape[0] - margin),
+            (margin, strip_height - margin),
             cv2.FONT_HERSHEY_SIMPLEX,
             self.config.ui.font_scale,
             (0, 0, 0),
             max(1, self.config.ui.line_thickness),
             lineType=cv2.LINE_AA,
         )
-        cv2.addWeighted(overlay, 0.8, img, 0.2, 0, img)
+        self._banner = (key, strip)
+        return strip
+
+    def _draw_event_text(self, img: np.ndarray, event_text: str):
+        if not event_text:
+            return
+        strip = self._banner_strip(img.shape[1], img.shape[0], event_text)
+        roi = img[img.shape[0] - strip.shape[0] :]
+        cv2.addWeighted(strip, 0.8, roi, 0.2, 0, roi)
 
     def render(
         self,
@@ -96,11 +165,17 @@ class RGBView:
         targets: List[Target3D],
         alert: bool,
         event_text: str = "",
-    ):
-        canvas = frame.image.copy()
-        self._draw_detections(canvas, det)
-        self._draw_targets(canvas, targets)
-        self._draw_status(canvas, alert)
-        if event_text:
-            self._draw_event_text(canvas, event_text)
-        cv2.imshow(self.window_name, canvas)
+    ) -> np.ndarray:
+        with metrics.timer("ui.rgb_draw"):
+            canvas = self._canvas_for(frame.image)
+            scale = canvas.shape[1] / frame.image.shape[1]
+            self._draw_zones(canvas)
+            self._draw_detections(canvas, det, scale)
+            self._draw_targets(canvas, targets, scale)
+            self._draw_status(canvas, alert)
+            if event_text:
+                self._draw_event_text(canvas, event_text)
+        if not self.offscreen:
+            with metrics.timer("ui.rgb_show"):
+                cv2.imshow(self.window_name, canvas)
+        return canvas
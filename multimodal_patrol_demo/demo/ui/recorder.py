@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from pathlib import Path
+from typing import Deque, Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from demo.metrics import metrics
+from demo.types import AlertEvent
+
+
+class Recorder:
+    """Archives annotated frames to segmented video files and alert snapshots.
+
+    ``submit`` copies the frame into a bounded queue and returns at once; a
+    background thread encodes it with ``cv2.VideoWriter``, starting a new
+    file every ``segment_s`` seconds of video (or when the frame size
+    changes). For frames that raised alert events it also writes JPEG
+    snapshots of the frame and of the last ``pre_event_frames`` recorded
+    frames before it. When the queue is full a plain frame is dropped and
+    counted, so a slow encoder or disk never stalls the detection loop. A
+    frame with alert events evicts the oldest plain frame instead, or, if
+    there is none, is queued beyond ``queue_size``; only past twice that
+    is it dropped too (counted as ``alerts_dropped``).
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        fps: float = 10.0,
+        segment_s: float = 300.0,
+        codec: str = "mp4v",
+        queue_size: int = 32,
+        pre_event_frames: int = 10,
+        snapshot_quality: int = 90,
+        record_video: bool = True,
+    ) -> None:
+        self.root = Path(root)
+        self.fps = fps if fps > 0 else 10.0
+        self.segment_frames = max(1, int(round(segment_s * self.fps)))
+        self.codec = codec
+        self.record_video = record_video
+        self.snapshot_quality = snapshot_quality
+        self.queue_size = max(1, queue_size)
+        self._items: Deque[Tuple[float, np.ndarray, list]] = deque()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._ring: Deque[Tuple[float, np.ndarray]] = deque(maxlen=max(0, pre_event_frames))
+        self._thread: Optional[threading.Thread] = None
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._writer_size: Optional[Tuple[int, int]] = None
+        self._segment_count = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "queued": 0,
+            "dropped": 0,
+            "alerts_dropped": 0,
+            "written": 0,
+            "segments": 0,
+            "snapshots": 0,
+        }
+
+    def start(self) -> "Recorder":
+        (self.root / "snapshots").mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def accepting(self) -> bool:
+        """``False`` while the queue is full; callers can skip rendering a plain frame that would be dropped."""
+        with self._cond:
+            return len(self._items) < self.queue_size
+
+    def _evict_plain_frame(self) -> bool:
+        for i, (_, _, events) in enumerate(self._items):
+            if not events:
+                del self._items[i]
+                return True
+        return False
+
+    def submit(self, image: np.ndarray, timestamp: float, events: Sequence[AlertEvent] = ()) -> bool:
+        """Queues a copy of ``image``; returns ``False`` if it was dropped because the queue was full."""
+        if not events and not self.accepting:
+            self.drop()
+            return False
+        # Copied outside the lock so the encoder thread is never kept waiting on a frame copy.
+        image = image.copy()
+        with self._cond:
+            if len(self._items) >= self.queue_size:
+                if not events:
+                    self.drop()
+                    return False
+                if self._evict_plain_frame():
+                    self.drop()
+                elif len(self._items) >= 2 * self.queue_size:
+                    with self._lock:
+                        self._stats["alerts_dropped"] += 1
+                    metrics.inc("recorder.alerts_dropped")
+                    return False
+            self._items.append((timestamp, image, list(events)))
+            self._cond.notify()
+            depth = len(self._items)
+        with self._lock:
+            self._stats["queued"] += 1
+        metrics.set_gauge("queue.recorder", depth)
+        return True
+
+    def drop(self) -> None:
+        """Counts a dropped frame; also for callers that skipped rendering because ``accepting`` was ``False``."""
+        with self._lock:
+            self._stats["dropped"] += 1
+        metrics.inc("recorder.frames_dropped")
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._items and not self._stopping:
+                    self._cond.wait()
+                if not self._items:
+                    break
+                timestamp, image, events = self._items.popleft()
+            with metrics.timer("recorder.write"):
+                if self.record_video:
+                    self._write_frame(image)
+                if events:
+                    self._write_snapshots(timestamp, image, events)
+            self._ring.append((timestamp, image))
+        self._close_writer()
+
+    def _write_frame(self, image: np.ndarray) -> None:
+        size = (image.shape[1], image.shape[0])
+        if self._writer is None or size != self._writer_size or self._segment_count >= self.segment_frames:
+            self._open_writer(size)
+            if self._writer is None:
+                return
+        self._writer.write(image)
+        self._segment_count += 1
+        with self._lock:
+            self._stats["written"] += 1
+
+    def _open_writer(self, size: Tuple[int, int]) -> None:
+        self._close_writer()
+        suffix = ".avi" if self.codec.upper() in ("MJPG", "XVID") else ".mp4"
+        path = self.root / f"{time.strftime('%Y%m%d-%H%M%S')}-{self._stats['segments']:04d}{suffix}"
+        self._writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*self.codec), self.fps, size)
+        if not self._writer.isOpened():
+            # Keep taking snapshots; without a working codec there is no video to write.
+            print(f"[录像] 无法以编码 {self.codec} 打开 {path}，仅保存告警快照")
+            self._writer = None
+            self.record_video = False
+            return
+        self._writer_size = size
+        self._segment_count = 0
+        with self._lock:
+            self._stats["segments"] += 1
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+    def _write_snapshots(self, timestamp: float, image: np.ndarray, events: Sequence[AlertEvent]) -> None:
+        first = events[0]
+        folder = self.root / "snapshots" / f"{timestamp:010.2f}_{first.zone_name}_{first.class_name}"
+        folder.mkdir(parents=True, exist_ok=True)
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.snapshot_quality]
+        for k, (ts, frame) in enumerate(self._ring):
+            cv2.imwrite(str(folder / f"pre_{k:03d}_{ts:.2f}.jpg"), frame, params)
+        cv2.imwrite(str(folder / f"alert_{timestamp:.2f}.jpg"), image, params)
+        (folder / "events.json").write_text(
+            json.dumps([asdict(e) for e in events], ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        with self._lock:
+            self._stats["snapshots"] += 1
+
+    def close(self, timeout_s: float = 30.0) -> None:
+        """Encodes the frames still queued (up to ``timeout_s``) and finalizes the current file."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout=timeout_s)
+        self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+def create_recorder(config, fps: float) -> Optional[Recorder]:
+    if not config.enabled:
+        return None
+    return Recorder(
+        config.path,
+        fps=config.fps if config.fps > 0 else fps,
+        segment_s=config.segment_s,
+        codec=config.codec,
+        queue_size=config.queue_size,
+        pre_event_frames=config.pre_event_frames,
+        snapshot_quality=config.snapshot_quality,
+        record_video=config.record_video,
+    ).start()
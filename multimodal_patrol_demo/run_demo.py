@@ -1,95 +1,281 @@
+import argparse
 import time
 from pathlib import Path
+from typing import Optional, Tuple
 
 from demo.config import load_config
 from demo.data_simulator import DataSimulator
+from demo.event_store import create_event_store
 from demo.fusion.fusion_engine import FusionEngine
-from demo.fusion.zone_logic import ZoneMonitor
-from demo.inference import create_backend
+from demo.fusion.preprocess import PointCloudPreprocessor
+from demo.fusion.tracker import MultiObjectTracker
+from demo.fusion.zone_logic import create_zone_monitor
+from demo.inference import MicroBatcher, create_backend
 from demo.llm.llm_client import create_llm_client
+from demo.llm.narrator import EventNarrator
 from demo.llm.report_generator import ReportGenerator
-from demo.time_utils import get_play_interval
-from demo.types import AlertEvent, PatrolReport
+from demo.llm.summarizer import StreamingSummarizer
+from demo.metrics import configure_metrics, metrics
+from demo.pipeline import FramePacket, Pipeline, Stage
+from demo.scheduler import PlaybackScheduler, create_scheduler
+from demo.types import PatrolReport
 from demo.ui.controller import handle_keyboard
 from demo.ui.o3d_viewer import PointCloudView
 from demo.ui.opencv_ui import RGBView
+from demo.ui.recorder import Recorder, create_recorder
 
 
-def main():
-    config = load_config("config.yaml")
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a patrol sequence with detection, fusion and alerts.")
+    parser.add_argument("--config", default="config.yaml", help="Path to config.yaml")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="No windows or keyboard polling, no playback throttling (overrides ui.headless)",
+    )
+    return parser.parse_args()
+
+
+PAUSE_POLL_S = 0.03
+
+
+def record_packet(recorder: Recorder, view: RGBView, packet: FramePacket, canvas=None) -> None:
+    """Hands the annotated frame to the recorder, rendering it offscreen if it was not drawn yet."""
+    if not packet.events and not recorder.accepting:
+        # Dropped anyway; skip the render so a full recorder costs the loop nothing.
+        recorder.drop()
+        return
+    if canvas is None:
+        canvas = view.render(packet.rgb, packet.det, packet.targets, packet.alert, event_text=packet.event_text)
+    recorder.submit(canvas, packet.rgb.timestamp, packet.events)
+
+
+def run_interactive(
+    config,
+    pipeline: Pipeline,
+    source,
+    scheduler: Optional[PlaybackScheduler],
+    recorder: Optional[Recorder] = None,
+) -> int:
+    rgb_view = RGBView(config)
+    record_view = RGBView(config, offscreen=True)
+    pcd_view = PointCloudView(
+        config.ui.window_name_pcd,
+        max_fps=config.ui.pcd_max_fps,
+        max_points=config.ui.pcd_max_points,
+        threaded=config.ui.pcd_threaded,
+    )
+
+    frames_done = 0
+
+    # The OpenCV window stays on the main thread (HighGUI is not thread-safe); the Open3D
+    # window lives on its own thread and only ever shows the latest cloud.
+    # While paused the loop stops consuming, and backpressure stalls the upstream stages.
+    for packet in pipeline.run(source):
+        frames_done += 1
+        # Every frame went through fusion and zone logic; late ones are just not displayed.
+        show = scheduler is None or scheduler.wait(
+            scheduler.media_time(packet.index, packet.rgb.timestamp)
+        )
+        canvas = None
+        if show:
+            canvas = rgb_view.render(
+                packet.rgb, packet.det, packet.targets, packet.alert, event_text=packet.event_text
+            )
+            pcd_view.render(packet.pcd)
+        if recorder is not None:
+            # Frames skipped on screen are still recorded; alert frames take precedence in the queue.
+            record_packet(recorder, record_view, packet, canvas)
+
+        action = handle_keyboard()
+        if action == "toggle_pause":
+            if scheduler is not None:
+                scheduler.pause()
+            while action != "quit":
+                time.sleep(PAUSE_POLL_S)
+                action = handle_keyboard()
+                if action == "toggle_pause":
+                    break
+            if scheduler is not None:
+                scheduler.resume()
+        if action == "quit":
+            break
+    pcd_view.close()
+    stats = pcd_view.stats()
+    print(f"[点云显示] 提交 {stats['submitted']} 帧，绘制 {stats['drawn']} 帧，被新帧覆盖 {stats['superseded']} 帧")
+    return frames_done
+
+
+def run(config, headless: bool) -> Tuple[int, float]:
+    """Replays the configured sequence; returns the frames processed and the pipeline's wall time."""
+    exporter = configure_metrics(config.metrics)
 
     llm_client = create_llm_client(config.llm)
     report_generator = ReportGenerator(llm_client)
+    event_store = create_event_store(config.event_store)
+
+    def on_narration(event, text):
+        print("[LLM 事件描述]", text)
+        if event_store is not None:
+            # The event itself was stored when it was raised; this attaches the narration to it.
+            event_store.annotate(event, text)
+
+    narrator = EventNarrator(
+        report_generator,
+        queue_size=config.llm.narration_queue_size,
+        batch_size=config.llm.narration_batch_size,
+        on_text=on_narration,
+    ).start()
+    summarizer = StreamingSummarizer(
+        report_generator,
+        window_events=config.llm.summary_window_events,
+        window_s=config.llm.summary_window_s,
+        fanout=config.llm.summary_fanout,
+    ).start()
 
     simulator = DataSimulator(config.demo)
     backend = create_backend(config.model)
     backend.load()
+    batcher = None
+    if config.model.batch_size > 1:
+        batcher = MicroBatcher(
+            backend, config.model.batch_size, config.model.max_batch_wait_ms
+        ).start()
 
+    preprocessor = PointCloudPreprocessor(config.preprocess)
     fusion_engine = FusionEngine(config.fusion)
-    zone_monitor = ZoneMonitor(config.alert.stay_time_threshold_s)
+    tracker = MultiObjectTracker(config.tracker.iou_threshold, config.tracker.max_age_s)
+    zone_monitor = create_zone_monitor(config.fusion, config.alert)
 
     patrol_report = PatrolReport(events=[], start_time=0.0, end_time=0.0)
-    last_event_text = ""
     first_frame_ts = None
     last_frame_ts = None
-    prev_alert = False
 
-    rgb_view = RGBView(config)
-    pcd_view = PointCloudView(config.ui.window_name_pcd)
+    scheduler = None if headless else create_scheduler(config.demo)
+    recorder = create_recorder(config.recorder, fps=config.demo.play_fps)
 
-    paused = False
-    interval = get_play_interval(config.demo.play_fps)
+    def load_frames():
+        for index in range(len(simulator)):
+            if scheduler is not None and scheduler.should_skip(
+                scheduler.media_time(index, simulator.timestamps[index])
+            ):
+                continue
+            simulator.prefetch(index)
+            rgb_frame, pcd_frame = simulator.get_frame(index)
+            yield FramePacket(index=index, rgb=rgb_frame, pcd=pcd_frame)
 
-    for rgb_frame, pcd_frame in simulator.iter_frames():
-        action = handle_keyboard()
-        if action == "quit":
-            break
-        if action == "toggle_pause":
-            paused = not paused
+    def preprocess_stage(packet: FramePacket) -> FramePacket:
+        packet.pcd = preprocessor.process(packet.pcd)
+        return packet
 
-        if paused:
-            time.sleep(interval)
-            continue
+    def infer_stage(packet: FramePacket) -> FramePacket:
+        if batcher is not None:
+            # Hand the frame to the batcher and move on; the fuse stage waits on the
+            # future, so consecutive frames can share one forward pass.
+            packet.det_future = batcher.submit(packet.rgb)
+        else:
+            packet.det = backend.infer(packet.rgb)
+        return packet
 
+    def fuse_stage(packet: FramePacket) -> FramePacket:
+        with metrics.timer("infer.wait"):
+            det = packet.detections()
+        packet.targets = fusion_engine.fuse(det, packet.pcd, packet.rgb.image.shape[:2])
+        with metrics.timer("tracker.update"):
+            tracker.update(packet.targets, packet.rgb.timestamp)
+        with metrics.timer("zone.update"):
+            packet.alert, packet.events = zone_monitor.update(
+                packet.targets, packet.rgb.timestamp
+            )
+        return packet
+
+    def report_stage(packet: FramePacket) -> FramePacket:
+        nonlocal first_frame_ts, last_frame_ts
         if first_frame_ts is None:
-            first_frame_ts = rgb_frame.timestamp
-
-        det_result = backend.infer(rgb_frame)
-        targets = fusion_engine.fuse(det_result, pcd_frame, rgb_frame.image.shape[:2])
-        alert, duration_s = zone_monitor.update(targets, rgb_frame.timestamp)
-
-        event_text = ""
-        if alert and not prev_alert:
-            person_targets = [
-                t for t in targets if t.class_name == "person" and t.in_danger_zone
-            ]
-            if person_targets:
-                t = person_targets[0]
-                event = AlertEvent(
-                    timestamp=rgb_frame.timestamp,
-                    class_name=t.class_name,
-                    distance_m=t.distance_m,
-                    zone_name="danger_zone",
-                    duration_s=duration_s,
-                )
-                patrol_report.events.append(event)
-                event_text = report_generator.describe_single_event(event)
-                last_event_text = event_text or last_event_text
-                print("[LLM 事件描述]", last_event_text)
-
-        last_frame_ts = rgb_frame.timestamp
-        prev_alert = alert
-
-        display_text = event_text or last_event_text
-        rgb_view.render(rgb_frame, det_result, targets, alert, event_text=display_text)
-        pcd_view.render(pcd_frame)
-
-        time.sleep(interval)
+            first_frame_ts = packet.rgb.timestamp
+
+        # Narration runs on the narrator's thread; the overlay shows a template until it is ready.
+        # Events are folded into the running summary instead of being kept for the whole patrol.
+        for event in packet.events:
+            if event_store is not None:
+                event_store.append(event, packet.targets if config.event_store.store_targets else None)
+            summarizer.add(event)
+            narrator.submit(event)
+
+        last_frame_ts = packet.rgb.timestamp
+        packet.event_text = narrator.latest_text
+        return packet
+
+    pipeline = Pipeline(
+        [
+            Stage("preprocess", preprocess_stage),
+            Stage("infer", infer_stage),
+            Stage("fuse", fuse_stage),
+            Stage("report", report_stage),
+        ],
+        queue_size=config.pipeline.queue_size,
+    )
+
+    run_start = time.perf_counter()
+    if headless:
+        # Drain the pipeline as fast as the slowest stage allows.
+        frames_done = 0
+        record_view = RGBView(config, offscreen=True)
+        for packet in pipeline.run(load_frames()):
+            frames_done += 1
+            if recorder is not None:
+                record_packet(recorder, record_view, packet)
+    else:
+        frames_done = run_interactive(config, pipeline, load_frames(), scheduler, recorder)
+    wall_s = time.perf_counter() - run_start
+    fps = frames_done / wall_s if wall_s > 0 else 0.0
+    print(f"[运行统计] 处理 {frames_done} 帧，墙钟 {wall_s:.2f} 秒，端到端 {fps:.1f} FPS")
+    if scheduler is not None:
+        stats = scheduler.stats()
+        print(
+            f"[回放统计] 显示 {stats['shown']} 帧，超时未显示 {stats['dropped']} 帧，"
+            f"源端跳过 {stats['skipped']} 帧"
+        )
+    if exporter is not None:
+        exporter.stop()
+        for name, s in metrics.snapshot()["latency"].items():
+            print(
+                f"[阶段耗时] {name}: p50 {s['p50_ms']:.2f} ms, p95 {s['p95_ms']:.2f} ms, "
+                f"p99 {s['p99_ms']:.2f} ms (n={s['count']})"
+            )
+
+    simulator.close()
+    if recorder is not None:
+        recorder.close()
+        stats = recorder.stats()
+        print(
+            f"[录像] 写入 {stats['written']} 帧（{stats['segments']} 个文件），丢弃 {stats['dropped']} 帧"
+            f"，告警帧丢弃 {stats['alerts_dropped']} 帧，告警快照 {stats['snapshots']} 组：{recorder.root}"
+        )
+    narrator.stop(timeout_s=config.llm.timeout_s)
+    print("[事件描述统计]", narrator.stats())
+    if event_store is not None:
+        event_store.close()
+        print(
+            f"[事件存储] 本次写入 {event_store.written} 条（丢弃 {event_store.dropped} 条），"
+            f"库中共 {len(event_store)} 条：{event_store.root}"
+        )
+    if batcher is not None:
+        batcher.stop()
+        print(f"[批量推理] 平均批大小 {batcher.mean_batch_size:.2f}")
+    print("[帧缓存统计]", simulator.cache_stats())
+    if hasattr(backend, "preprocessor"):
+        print("[推理预处理统计]", backend.preprocessor.stats())
+    if config.preprocess.enabled:
+        print("[点云预处理统计]", preprocessor.stats())
 
     if first_frame_ts is not None and last_frame_ts is not None:
         patrol_report.start_time = first_frame_ts
         patrol_report.end_time = last_frame_ts
-        patrol_report = report_generator.summarize_report(patrol_report)
+        patrol_report.summary_text = summarizer.finish(
+            call_timeout_s=config.llm.timeout_s * (config.llm.max_retries + 1)
+        )
+        print("[总结统计]", summarizer.stats())
         print("==== 本次巡检总结 ====")
         print(patrol_report.summary_text)
 
@@ -98,6 +284,17 @@ def main():
         report_path = output_dir / "report.txt"
         report_path.write_text(patrol_report.summary_text, encoding="utf-8")
 
+    if hasattr(llm_client, "hit_rate"):
+        print("[LLM 缓存统计]", llm_client.stats())
+    llm_client.close()
+    return frames_done, wall_s
+
+
+def main():
+    args = parse_args()
+    config = load_config(args.config)
+    run(config, headless=args.headless or config.ui.headless)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,64 @@
+import argparse
+import time
+from pathlib import Path
+
+from demo.config import load_config
+from demo.event_store import create_event_store
+from demo.llm.llm_client import create_llm_client
+from demo.llm.report_generator import ReportGenerator
+from demo.llm.summarizer import StreamingSummarizer
+from demo.multistream import run_streams
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every configured patrol stream in parallel, headless.")
+    parser.add_argument("--config", default="config.yaml", help="Path to config.yaml")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    llm_client = create_llm_client(config.llm)
+    summarizer = StreamingSummarizer(
+        ReportGenerator(llm_client),
+        window_events=config.llm.summary_window_events,
+        window_s=config.llm.summary_window_s,
+        fanout=config.llm.summary_fanout,
+    ).start()
+    event_store = create_event_store(config.event_store)
+
+    def on_event(event, targets):
+        # Events from all streams arrive here as they are raised, on one thread.
+        if event_store is not None:
+            event_store.append(event, targets)
+        summarizer.add(event)
+
+    start = time.perf_counter()
+    patrol_report, results = run_streams(config, on_event=on_event)
+    wall_s = time.perf_counter() - start
+
+    for r in results:
+        print(f"[{r.name}] {r.frames} 帧，用时 {r.wall_s:.2f} 秒，{r.fps:.1f} FPS，{r.events} 个事件")
+    total_frames = sum(r.frames for r in results)
+    print(
+        f"[合计] {len(results)} 路，{total_frames} 帧，墙钟 {wall_s:.2f} 秒，"
+        f"总吞吐 {total_frames / wall_s if wall_s > 0 else 0.0:.1f} FPS"
+    )
+
+    if event_store is not None:
+        event_store.close()
+        print(f"[事件存储] 本次写入 {event_store.written} 条（丢弃 {event_store.dropped} 条）：{event_store.root}")
+
+    patrol_report.summary_text = summarizer.finish(
+        call_timeout_s=config.llm.timeout_s * (config.llm.max_retries + 1)
+    )
+    llm_client.close()
+    print("[总结统计]", summarizer.stats())
+    print("==== 本次巡检总结 ====")
+    print(patrol_report.summary_text)
+
+    output_dir = Path("output")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "report.txt").write_text(patrol_report.summary_text, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
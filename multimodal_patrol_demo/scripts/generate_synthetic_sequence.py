@@ -0,0 +1,156 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from demo.packed_sequence import write_packed_sequence  # noqa: E402
+
+# Synthetic pinhole camera looking along LiDAR +x, KITTI object calib layout.
+_CALIB_TEMPLATE = """P2: {f} 0 {cx} 0 0 {f} {cy} 0 0 0 1 0
+R0_rect: 1 0 0 0 1 0 0 0 1
+Tr_velo_to_cam: 0 -1 0 0 0 0 -1 0 1 0 0 0
+"""
+
+
+def write_calibration(output_root: Path, width: int, height: int) -> None:
+    calib = _CALIB_TEMPLATE.format(f=0.8 * width, cx=width / 2.0, cy=height / 2.0)
+    (output_root / "calib.txt").write_text(calib, encoding="utf-8")
+
+
+def _walker_positions(num_walkers: int, t: float, rng_offsets: np.ndarray) -> np.ndarray:
+    """(x forward, y left) of each walker in the LiDAR frame at time ``t``."""
+    phase = rng_offsets + 0.3 * t
+    x = 4.0 + 3.0 * (1.0 + np.sin(phase))
+    y = 2.5 * np.sin(1.7 * phase + rng_offsets)
+    return np.stack([x, y], axis=1)
+
+
+def _make_cloud(
+    rng: np.random.Generator, num_points: int, walkers: np.ndarray, sensor_height_m: float = 1.7
+) -> np.ndarray:
+    """Ground plane, scattered clutter and one upright cluster per walker, as KITTI (x, y, z, r) float32."""
+    per_walker = min(400, num_points // 10)
+    num_walker_points = per_walker * len(walkers)
+    num_ground = (num_points - num_walker_points) * 3 // 4
+    num_clutter = num_points - num_walker_points - num_ground
+
+    ground = np.empty((num_ground, 3), dtype=np.float32)
+    ground[:, 0] = rng.uniform(-40.0, 40.0, num_ground)
+    ground[:, 1] = rng.uniform(-40.0, 40.0, num_ground)
+    ground[:, 2] = -sensor_height_m + rng.normal(0.0, 0.02, num_ground)
+
+    clutter = rng.uniform((-40.0, -40.0, -sensor_height_m), (40.0, 40.0, 2.0), (num_clutter, 3)).astype(np.float32)
+
+    parts: List[np.ndarray] = [ground, clutter]
+    for x, y in walkers:
+        body = np.empty((per_walker, 3), dtype=np.float32)
+        body[:, 0] = x + rng.normal(0.0, 0.15, per_walker)
+        body[:, 1] = y + rng.normal(0.0, 0.15, per_walker)
+        body[:, 2] = rng.uniform(-sensor_height_m, -sensor_height_m + 1.75, per_walker)
+        parts.append(body)
+
+    xyz = np.concatenate(parts)
+    cloud = np.empty((len(xyz), 4), dtype=np.float32)
+    cloud[:, :3] = xyz
+    cloud[:, 3] = rng.uniform(0.0, 1.0, len(xyz))
+    return cloud
+
+
+def _make_image(background: np.ndarray, walkers: np.ndarray, width: int, height: int) -> np.ndarray:
+    img = background.copy()
+    f, cx, cy = 0.8 * width, width / 2.0, height / 2.0
+    for x, y in walkers:
+        # Project the walker's feet and head with the synthetic calibration.
+        u = cx + f * (-y) / x
+        v_feet = cy + f * 1.7 / x
+        v_head = cy + f * (1.7 - 1.75) / x
+        half_w = f * 0.3 / x
+        cv2.rectangle(
+            img,
+            (int(u - half_w), int(v_head)),
+            (int(u + half_w), int(v_feet)),
+            (40, 40, 200),
+            -1,
+        )
+    return img
+
+
+def generate_sequence(
+    output_root: Path,
+    num_frames: int = 100,
+    width: int = 1242,
+    height: int = 375,
+    num_points: int = 120_000,
+    fps: float = 10.0,
+    num_walkers: int = 3,
+    image_ext: str = ".png",
+    packed: bool = False,
+    seed: int = 0,
+) -> Path:
+    """Writes a deterministic synthetic sequence in the layout DataSimulator reads."""
+    output_root = Path(output_root)
+    rgb_out = output_root / "rgb"
+    pcd_out = output_root / "pointcloud"
+    rgb_out.mkdir(parents=True, exist_ok=True)
+    pcd_out.mkdir(parents=True, exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    # Sky/ground gradient plus fixed noise, so frames do not compress to nothing.
+    rows = np.linspace(0, 255, height, dtype=np.float32)[:, None, None]
+    background = np.broadcast_to(rows, (height, width, 3)).astype(np.uint8)
+    background = cv2.add(background, rng.integers(0, 32, (height, width, 3), dtype=np.uint8))
+    offsets = rng.uniform(0.0, 2.0 * np.pi, num_walkers)
+
+    timestamps = [i / fps for i in range(num_frames)]
+    pcd_files: List[Path] = []
+    for idx, t in enumerate(timestamps):
+        walkers = _walker_positions(num_walkers, t, offsets)
+        fname = f"{idx:06d}"
+        cv2.imwrite(str(rgb_out / f"{fname}{image_ext}"), _make_image(background, walkers, width, height))
+        pcd_path = pcd_out / f"{fname}.bin"
+        _make_cloud(rng, num_points, walkers).tofile(pcd_path)
+        pcd_files.append(pcd_path)
+
+    if packed:
+        packed_dir = write_packed_sequence(output_root / "packed", pcd_files, timestamps)
+        print(f"Packed point clouds written to {packed_dir}")
+
+    write_calibration(output_root, width, height)
+    with (output_root / "timestamps.txt").open("w", encoding="utf-8") as f:
+        for ts in timestamps:
+            f.write(f"{ts}\n")
+    print(f"Generated {num_frames} synthetic frames in {output_root}")
+    return output_root
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic RGB + LiDAR sequence for replay and benchmarks.")
+    parser.add_argument("--output_root", type=Path, default=Path("data/synthetic_sequence"))
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1242)
+    parser.add_argument("--height", type=int, default=375)
+    parser.add_argument("--points", type=int, default=120_000, help="Points per LiDAR scan")
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--walkers", type=int, default=3, help="Moving pedestrians in the scene")
+    parser.add_argument("--image_ext", choices=[".png", ".jpg"], default=".png")
+    parser.add_argument("--packed", action="store_true", help="Also write a packed memory-mapped copy of the clouds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_sequence(
+        args.output_root,
+        num_frames=args.frames,
+        width=args.width,
+        height=args.height,
+        num_points=args.points,
+        fps=args.fps,
+        num_walkers=args.walkers,
+        image_ext=args.image_ext,
+        packed=args.packed,
+        seed=args.seed,
+    )
@@ -0,0 +1,139 @@
+"""Local stand-in for an OpenAI-compatible chat-completions endpoint.
+
+Simulates latency and transient failures so the narration path (pooling,
+retries, batching, caching) can be exercised offline:
+
+    python scripts/llm_stub_server.py --port 8008 --latency_ms 300 --failure_rate 0.2
+    # config.yaml: llm.api_base: "http://127.0.0.1:8008/v1", and any non-empty API key
+
+GET /stats returns request, failure and TCP connection counts.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from demo.llm.report_generator import NUMBERED_LINE  # noqa: E402
+
+
+class StubState:
+    def __init__(self, latency_ms: float, jitter_ms: float, failure_rate: float, seed: int) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "failures": 0, "connections": 0}
+
+    def bump(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] += 1
+
+    def roll(self) -> tuple[float, bool]:
+        with self.lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+            return delay, self.rng.random() < self.failure_rate
+
+
+def fake_reply(user_prompt: str) -> str:
+    """Answers every numbered input line with a numbered line, like a batched narration."""
+    lines = user_prompt.splitlines()
+    numbered = [m for m in (NUMBERED_LINE.match(line) for line in lines) if m]
+    if numbered:
+        return "\n".join(f"{m.group(1)}. [stub] {m.group(2)}" for m in numbered)
+    return f"[stub] {lines[-1] if lines else ''}"
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections alive, so client-side pooling is visible in /stats.
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            state.bump("connections")
+
+        def log_message(self, format, *args) -> None:  # noqa: A002
+            return
+
+        def _send_json(self, status: int, body: dict) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.rstrip("/") == "/stats":
+                with state.lock:
+                    self._send_json(200, dict(state.counts))
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self) -> None:  # noqa: N802
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": "not found"})
+                return
+            state.bump("requests")
+            delay, fail = state.roll()
+            time.sleep(delay)
+            if fail:
+                state.bump("failures")
+                self._send_json(503, {"error": {"message": "stub: simulated overload"}})
+                return
+            messages = payload.get("messages", [])
+            user_prompt = messages[-1]["content"] if messages else ""
+            self._send_json(
+                200,
+                {
+                    "id": "stub",
+                    "object": "chat.completion",
+                    "model": payload.get("model", "stub"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": fake_reply(user_prompt)},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                },
+            )
+
+    return Handler
+
+
+def serve(host: str, port: int, state: StubState) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server with simulated latency and failures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8008)
+    parser.add_argument("--latency_ms", type=float, default=200.0)
+    parser.add_argument("--jitter_ms", type=float, default=50.0)
+    parser.add_argument("--failure_rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub_state = StubState(args.latency_ms, args.jitter_ms, args.failure_rate, args.seed)
+    httpd = serve(args.host, args.port, stub_state)
+    print(f"LLM stub listening on http://{args.host}:{args.port}/v1")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
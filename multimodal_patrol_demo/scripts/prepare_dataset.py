@@ -1,9 +1,15 @@
 import argparse
 import shutil
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from demo.packed_sequence import write_packed_sequence  # noqa: E402
+
+
 def parse_timestamps(ts_file: Path) -> List[float]:
     raw_times: List[datetime] = []
     with ts_file.open("r", encoding="utf-8") as f:
@@ -22,7 +28,20 @@ def parse_timestamps(ts_file: Path) -> List[float]:
     return [float((t - base).total_seconds()) for t in raw_times]
 
 
-def convert_sequence(kitti_root: Path, output_root: Path):
+def write_calibration(kitti_root: Path, output_root: Path) -> None:
+    # Raw drives keep calibration next to the drive folder, split over two files.
+    # FusionEngine reads P_rect_02/R_rect_00 and R/T, so concatenating them is enough.
+    calib_files = [kitti_root.parent / "calib_cam_to_cam.txt", kitti_root.parent / "calib_velo_to_cam.txt"]
+    if not all(p.exists() for p in calib_files):
+        print("[skip] Calibration files not found next to the drive; projection fusion will be unavailable")
+        return
+    calib_out = output_root / "calib.txt"
+    with calib_out.open("w", encoding="utf-8") as f:
+        for p in calib_files:
+            f.write(p.read_text(encoding="utf-8").rstrip("\n") + "\n")
+
+
+def convert_sequence(kitti_root: Path, output_root: Path, output_format: str = "files"):
     image_dir = kitti_root / "image_02" / "data"
     lidar_dir = kitti_root / "velodyne_points" / "data"
     ts_file = kitti_root / "timestamps.txt"
@@ -41,16 +60,25 @@ def convert_sequence(kitti_root: Path, output_root: Path):
             )
         )
 
+    write_files = output_format in ("files", "both")
     rgb_out = output_root / "rgb"
     pcd_out = output_root / "pointcloud"
     rgb_out.mkdir(parents=True, exist_ok=True)
-    pcd_out.mkdir(parents=True, exist_ok=True)
+    if write_files:
+        pcd_out.mkdir(parents=True, exist_ok=True)
 
     for idx, (img, lidar) in enumerate(zip(image_files, lidar_files)):
         fname = f"{idx:06d}"
         shutil.copy2(img, rgb_out / f"{fname}{img.suffix}")
-        # KITTI lidar files are .bin and already in expected format
-        shutil.copy2(lidar, pcd_out / f"{fname}{lidar.suffix}")
+        if write_files:
+            # KITTI lidar files are .bin and already in expected format
+            shutil.copy2(lidar, pcd_out / f"{fname}{lidar.suffix}")
+
+    if output_format in ("packed", "both"):
+        packed_dir = write_packed_sequence(output_root / "packed", lidar_files, timestamps)
+        print(f"Packed point clouds written to {packed_dir}")
+
+    write_calibration(kitti_root, output_root)
 
     ts_out = output_root / "timestamps.txt"
     with ts_out.open("w", encoding="utf-8") as f:
@@ -63,6 +91,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Prepare KITTI raw sequence for demo replay.")
     parser.add_argument("--kitti_root", type=Path, required=True, help="Path to KITTI drive directory (e.g., 2011_09_26_drive_xxxx_sync)")
     parser.add_argument("--output_root", type=Path, required=True, help="Output directory for processed sequence")
+    parser.add_argument(
+        "--format",
+        choices=["files", "packed", "both"],
+        default="files",
+        help="Write per-frame pointcloud files, a packed memory-mapped sequence, or both",
+    )
     args = parser.parse_args()
 
-    convert_sequence(args.kitti_root, args.output_root)
+    convert_sequence(args.kitti_root, args.output_root, args.format)
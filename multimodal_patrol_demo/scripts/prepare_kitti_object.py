@@ -4,8 +4,13 @@ import argparse
 import os
 from pathlib import Path
 import shutil
+import sys
 from typing import List
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from demo.packed_sequence import write_packed_sequence  # noqa: E402
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -33,6 +38,12 @@ def parse_args() -> argparse.Namespace:
         default=300,
         help="Maximum number of frames to copy/link",
     )
+    parser.add_argument(
+        "--format",
+        default="files",
+        choices=["files", "packed", "both"],
+        help="Write per-frame pointcloud links, a packed memory-mapped sequence, or both",
+    )
     return parser.parse_args()
 
 
@@ -61,6 +72,7 @@ def main() -> None:
     root = Path(args.kitti_object_root)
     image_dir = root / args.split / "image_2"
     velodyne_dir = root / args.split / "velodyne"
+    calib_dir = root / args.split / "calib"
 
     if not image_dir.exists() or not velodyne_dir.exists():
         raise FileNotFoundError(
@@ -71,12 +83,15 @@ def main() -> None:
     output_root = Path(args.output_root)
     rgb_out = output_root / "rgb"
     pcd_out = output_root / "pointcloud"
+    write_files = args.format in ("files", "both")
     ensure_dir(rgb_out)
-    ensure_dir(pcd_out)
+    if write_files:
+        ensure_dir(pcd_out)
 
     images = list_images(image_dir, args.num_frames)
 
     kept = 0
+    kept_bins: List[Path] = []
     for img_path in images:
         stem = img_path.stem
         bin_path = velodyne_dir / f"{stem}.bin"
@@ -84,16 +99,31 @@ def main() -> None:
             print(f"[skip] Missing velodyne for {stem}")
             continue
         link_or_copy(img_path, rgb_out / f"{stem}.png")
-        link_or_copy(bin_path, pcd_out / f"{stem}.bin")
+        if write_files:
+            link_or_copy(bin_path, pcd_out / f"{stem}.bin")
+        kept_bins.append(bin_path)
         kept += 1
 
     if kept == 0:
         raise RuntimeError("No frames were prepared; check dataset paths and content.")
 
+    timestamps = [round(i * 0.1, 1) for i in range(kept)]
     timestamps_file = output_root / "timestamps.txt"
     with timestamps_file.open("w", encoding="utf-8") as f:
-        for i in range(kept):
-            f.write(f"{i * 0.1:.1f}\n")
+        for ts in timestamps:
+            f.write(f"{ts:.1f}\n")
+
+    # KITTI object frames carry one calib file each; the demo uses a single camera
+    # setup, so the first kept frame's calibration is used for the whole sequence.
+    first_calib = calib_dir / f"{kept_bins[0].stem}.txt"
+    if first_calib.exists():
+        shutil.copyfile(first_calib, output_root / "calib.txt")
+    else:
+        print(f"[skip] Missing calibration {first_calib}; projection fusion will be unavailable")
+
+    if args.format in ("packed", "both"):
+        packed_dir = write_packed_sequence(output_root / "packed", kept_bins, timestamps)
+        print(f"Packed point clouds written to {packed_dir}")
 
     print(f"Prepared {kept} frames to {output_root} using split '{args.split}'.")
 
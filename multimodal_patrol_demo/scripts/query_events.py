@@ -0,0 +1,38 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from demo.event_store import EventStore  # noqa: E402
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the alert event store written by run_demo.py.")
+    parser.add_argument("--store", type=Path, default=Path("output/events"))
+    parser.add_argument("--start", type=float, default=None, help="Earliest event timestamp (s)")
+    parser.add_argument("--end", type=float, default=None, help="Latest event timestamp (s)")
+    parser.add_argument("--zone", default=None)
+    parser.add_argument("--class_name", default=None)
+    parser.add_argument("--patrol", default=None, help="Patrol ID; see --list_patrols")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--count", action="store_true", help="Only print counts, per zone")
+    parser.add_argument("--list_patrols", action="store_true")
+    args = parser.parse_args()
+
+    store = EventStore(args.store)
+    if args.list_patrols:
+        for patrol_id in store.patrols():
+            print(patrol_id, store.count(patrol_id=patrol_id))
+    elif args.count:
+        print("total", store.count(args.start, args.end, args.zone, args.class_name, args.patrol))
+        if args.zone is None and args.class_name is None:
+            for zone, n in store.zone_counts(args.start, args.end, args.patrol).items():
+                print(zone, n)
+    else:
+        for event, _ in store.query(args.start, args.end, args.zone, args.class_name, args.patrol, limit=args.limit):
+            track = f" track {event.track_id}" if event.track_id is not None else ""
+            print(
+                f"{event.timestamp:10.2f}s  {event.zone_name:16s} {event.class_name:10s}{track}  "
+                f"{event.distance_m:.1f}m  dwell {event.duration_s:.1f}s  {event.extra_info or ''}"
+            )
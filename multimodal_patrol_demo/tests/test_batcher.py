@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pytest
+
+from demo.inference.backend_base import InferenceBackend
+from demo.inference.batcher import MicroBatcher
+from demo.types import DetectionResult, RGBFrame
+
+
+def result(timestamp: float) -> DetectionResult:
+    return DetectionResult(
+        boxes=np.zeros((0, 4)), scores=np.zeros(0), class_ids=np.zeros(0), class_names=[], timestamp=timestamp
+    )
+
+
+class RecordingBackend(InferenceBackend):
+    def __init__(self, drop_last: bool = False) -> None:
+        self.batch_sizes = []
+        self.drop_last = drop_last
+        self.release = threading.Event()
+        self.release.set()
+
+    def load(self):
+        pass
+
+    def infer(self, frame: RGBFrame) -> DetectionResult:
+        return result(frame.timestamp)
+
+    def infer_batch(self, frames):
+        self.release.wait(timeout=5.0)
+        self.batch_sizes.append(len(frames))
+        results = [self.infer(f) for f in frames]
+        return results[:-1] if self.drop_last else results
+
+
+def frame(timestamp: float) -> RGBFrame:
+    return RGBFrame(image=np.zeros((2, 2, 3), dtype=np.uint8), timestamp=timestamp)
+
+
+def test_each_future_gets_its_own_frames_result():
+    backend = RecordingBackend()
+    backend.release.clear()
+    batcher = MicroBatcher(backend, max_batch_size=4, max_wait_ms=50).start()
+    try:
+        futures = [batcher.submit(frame(float(i))) for i in range(6)]
+        backend.release.set()
+        assert [f.result(timeout=5.0).timestamp for f in futures] == [float(i) for i in range(6)]
+    finally:
+        batcher.stop()
+    assert max(backend.batch_sizes) <= 4
+    assert sum(backend.batch_sizes) == 6
+
+
+def test_a_short_batch_fails_every_future_instead_of_hanging():
+    batcher = MicroBatcher(RecordingBackend(drop_last=True), max_batch_size=4, max_wait_ms=50).start()
+    try:
+        futures = [batcher.submit(frame(float(i))) for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="returned"):
+                future.result(timeout=5.0)
+    finally:
+        batcher.stop()
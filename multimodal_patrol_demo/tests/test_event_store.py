@@ -0,0 +1,68 @@
+import json
+
+from demo.event_store import INDEX_DTYPE, EventStore
+from demo.types import AlertEvent
+
+
+def event(ts: float, zone: str = "danger_zone", class_name: str = "person") -> AlertEvent:
+    return AlertEvent(timestamp=ts, class_name=class_name, distance_m=5.0, zone_name=zone, duration_s=6.0)
+
+
+def write_patrol(root, timestamps, **kwargs) -> EventStore:
+    store = EventStore(root, **kwargs).start()
+    for ts in timestamps:
+        store.append(event(ts))
+    store.close()
+    return store
+
+
+def test_each_patrol_gets_its_own_sorted_segment(tmp_path):
+    first = write_patrol(tmp_path, [0.0, 1.0, 2.0])
+    second = write_patrol(tmp_path, [0.5, 1.5])
+    segments = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))["segments"]
+    assert [s["patrol"] for s in segments] == [first.patrol_id, second.patrol_id]
+    assert all(s["sorted"] for s in segments)
+
+    store = EventStore(tmp_path)
+    assert len(store) == 5
+    assert store.count(0.4, 1.6) == 3
+    assert store.count(patrol_id=second.patrol_id) == 2
+    assert [e.timestamp for e, _ in store.query(patrol_id=first.patrol_id)] == [0.0, 1.0, 2.0]
+
+
+def test_torn_tail_is_ignored_by_readers_and_cut_by_the_next_writer(tmp_path):
+    write_patrol(tmp_path, [0.0, 1.0, 2.0])
+    # A crash mid-batch: half an index record and an unindexed log line.
+    with (tmp_path / "seg-000001.idx").open("ab") as idx:
+        idx.write(b"\0" * (INDEX_DTYPE.itemsize // 2))
+    with (tmp_path / "seg-000001.jsonl").open("ab") as log:
+        log.write(b'{"timestamp": 3.0, "class_na')
+
+    assert len(EventStore(tmp_path)) == 3
+
+    write_patrol(tmp_path, [10.0])
+    assert (tmp_path / "seg-000001.idx").stat().st_size == 3 * INDEX_DTYPE.itemsize
+    store = EventStore(tmp_path)
+    assert [e.timestamp for e, _ in store.query()] == [0.0, 1.0, 2.0, 10.0]
+
+
+def test_append_drops_instead_of_blocking_when_the_writer_is_behind(tmp_path):
+    # Not started, so nothing drains the queue.
+    store = EventStore(tmp_path, queue_size=2)
+    assert store.append(event(0.0))
+    assert store.append(event(1.0))
+    assert not store.append(event(2.0))
+    assert store.dropped == 1
+
+
+def test_annotations_are_returned_as_extra_info(tmp_path):
+    store = EventStore(tmp_path).start()
+    first, second = event(0.0), event(1.0)
+    store.append(first)
+    store.append(second)
+    assert store.annotate(second, "narrated later")
+    store.close()
+
+    events = [e for e, _ in EventStore(tmp_path).query()]
+    assert [e.extra_info for e in events] == [None, "narrated later"]
+    assert events[1].event_id == second.event_id
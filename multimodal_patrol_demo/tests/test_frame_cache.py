@@ -0,0 +1,32 @@
+import numpy as np
+
+from demo.frame_cache import FrameCache, frame_nbytes, resident_nbytes
+from demo.types import PointCloudFrame, RGBFrame
+
+
+def frame(points: np.ndarray) -> tuple:
+    return RGBFrame(image=np.zeros((4, 5, 3), dtype=np.uint8), timestamp=0.0), PointCloudFrame(points, 0.0)
+
+
+def test_strided_view_counts_its_whole_scan():
+    scan = np.zeros((100, 4), dtype=np.float32)
+    assert resident_nbytes(scan[:, :3]) == scan.nbytes
+    assert frame_nbytes(frame(scan[:, :3])) == 4 * 5 * 3 + scan.nbytes
+
+
+def test_memmap_views_count_as_zero(tmp_path):
+    path = tmp_path / "points.npy"
+    np.save(path, np.zeros((100, 3), dtype=np.float32))
+    points = np.load(path, mmap_mode="r")
+    assert resident_nbytes(points[10:20]) == 0
+    assert resident_nbytes(np.asarray(points[10:20])) == 0
+
+
+def test_cache_evicts_least_recently_used_within_budget():
+    scan_bytes = frame_nbytes(frame(np.zeros((10, 4), dtype=np.float32)[:, :3]))
+    cache = FrameCache(max_bytes=2 * scan_bytes)
+    for index in range(3):
+        cache.put(index, frame(np.zeros((10, 4), dtype=np.float32)[:, :3]))
+    assert cache.get(0) is None
+    assert cache.get(2) is not None
+    assert cache.current_bytes == 2 * scan_bytes
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+
+from demo.config import FusionConfig, ZoneConfig
+from demo.fusion.fusion_engine import FusionEngine
+from demo.fusion.projection import project_to_image, virtual_camera_matrix
+from demo.types import DetectionResult, PointCloudFrame
+
+IMAGE_SHAPE = (400, 800)
+
+
+def engine(max_distance_m: float = 0.0) -> FusionEngine:
+    config = FusionConfig(
+        use_projection=False,
+        danger_zone=None,
+        min_distance_m=0.0,
+        max_distance_m=max_distance_m,
+        zones=[ZoneConfig(name="left", polygon=[[0.0, 0.0], [0.5, 0.0], [0.5, 1.0], [0.0, 1.0]])],
+        camera_hfov_deg=90.0,
+    )
+    return FusionEngine(config)
+
+
+def test_virtual_camera_centres_the_forward_axis():
+    matrix = virtual_camera_matrix(IMAGE_SHAPE, hfov_deg=90.0)
+    points = np.array([[10.0, 0.0, 0.0], [10.0, 10.0, 0.0], [10.0, 0.0, 2.0]], dtype=np.float32)
+    projected = project_to_image(points, matrix, IMAGE_SHAPE)
+    assert np.allclose(projected.uv[0], [400, 200])
+    # 45 degrees to the left lands on the left edge of a 90 degree view.
+    assert np.allclose(projected.uv[1], [0, 200])
+    # Up is towards the top of the image.
+    assert projected.uv[2, 1] < 200
+
+
+def test_each_box_gets_the_median_of_its_own_points():
+    # A target 5 m ahead-left, another 20 m ahead-right, nothing in the sky.
+    left = np.array([5.0, 1.0, 0.0]) + np.random.default_rng(0).normal(0, 0.01, (50, 3))
+    right = np.array([20.0, -4.0, 0.0]) + np.random.default_rng(1).normal(0, 0.01, (50, 3))
+    pcd = PointCloudFrame(points=np.vstack([left, right]).astype(np.float32), timestamp=0.0)
+    fusion = engine()
+    frame = fusion.prepare_frame(pcd, IMAGE_SHAPE)
+    assert np.all(np.diff(frame.u) >= 0)
+
+    boxes = np.array([[300, 180, 340, 220], [460, 180, 500, 220], [0, 0, 40, 40]], dtype=np.float32)
+    distances = fusion.box_distances(boxes, frame)
+    assert abs(distances[0] - math.hypot(5.0, 1.0)) < 0.05
+    assert abs(distances[1] - math.hypot(20.0, 4.0)) < 0.05
+    assert math.isnan(distances[2])
+
+
+def test_points_in_the_distance_band_win():
+    near_and_far = np.array([[5.0, 0.0, 0.0]] * 3 + [[30.0, 0.0, 0.0]] * 5, dtype=np.float32)
+    pcd = PointCloudFrame(points=near_and_far, timestamp=0.0)
+    box = np.array([[390, 190, 410, 210]], dtype=np.float32)
+    assert engine().box_distances(box, engine().prepare_frame(pcd, IMAGE_SHAPE))[0] == 30.0
+    banded = engine(max_distance_m=8.0)
+    assert banded.box_distances(box, banded.prepare_frame(pcd, IMAGE_SHAPE))[0] == 5.0
+
+
+def test_fuse_builds_targets_with_zones():
+    pcd = PointCloudFrame(points=np.array([[5.0, 1.0, 0.0]], dtype=np.float32), timestamp=0.0)
+    det = DetectionResult(
+        boxes=np.array([[300, 180, 340, 220]], dtype=np.float32),
+        scores=np.array([0.9], dtype=np.float32),
+        class_ids=np.array([0]),
+        class_names=["person"],
+        timestamp=1.0,
+    )
+    (target,) = engine().fuse(det, pcd, IMAGE_SHAPE)
+    assert target.class_name == "person"
+    assert target.zones == ["left"] and target.in_danger_zone
+    assert abs(target.distance_m - math.hypot(5.0, 1.0)) < 1e-4
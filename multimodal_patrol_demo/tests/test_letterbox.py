@@ -0,0 +1,41 @@
+import numpy as np
+
+from demo.inference.preprocess import LetterboxPreprocessor, scale_boxes_to_original
+
+
+def test_letterbox_layout_padding_and_channel_order():
+    image = np.zeros((20, 40, 3), dtype=np.uint8)
+    image[..., 0] = 255  # blue in BGR
+    pre = LetterboxPreprocessor((32, 32))
+    blob, (info,) = pre([image])
+    assert blob.shape == (1, 3, 32, 32)
+    assert info.ratio == 0.8 and info.pad == (0.0, 8.0)
+    # RGB order: blue ends up in the last channel, scaled to [0, 1].
+    assert np.allclose(blob[0, 2, 8:24], 1.0) and np.allclose(blob[0, 0, 8:24], 0.0)
+    assert np.allclose(blob[0, :, :8], 114 / 255.0) and np.allclose(blob[0, :, 24:], 114 / 255.0)
+
+
+def test_buffers_are_reused_across_frames_of_the_same_shape():
+    pre = LetterboxPreprocessor((32, 32), max_batch=2)
+    frames = [np.full((20, 40, 3), i, dtype=np.uint8) for i in range(2)]
+    pre(frames)
+    allocations = pre.buffer_allocations
+    for _ in range(5):
+        pre(frames)
+    assert pre.buffer_allocations == allocations
+
+
+def test_padding_is_repainted_when_the_source_shape_changes():
+    pre = LetterboxPreprocessor((32, 32))
+    pre([np.full((32, 32, 3), 255, dtype=np.uint8)])
+    blob, _ = pre([np.zeros((16, 32, 3), dtype=np.uint8)])
+    assert np.allclose(blob[0, :, :8], 114 / 255.0)
+
+
+def test_boxes_map_back_to_the_original_image():
+    pre = LetterboxPreprocessor((32, 32))
+    _, (info,) = pre([np.zeros((20, 40, 3), dtype=np.uint8)])
+    boxes = np.array([[8, 16, 16, 24], [-5, 0, 40, 40]], dtype=np.float32)
+    out = scale_boxes_to_original(boxes, info.ratio, info.pad, info.image_shape)
+    assert np.allclose(out[0], [10, 10, 20, 20])
+    assert np.allclose(out[1], [0, 0, 40, 20])
@@ -0,0 +1,58 @@
+from demo.llm.cache import CachedLLMClient, bucket_numbers, cache_key
+from demo.llm.llm_client import BaseLLMClient
+
+
+class RecordingClient(BaseLLMClient):
+    def __init__(self) -> None:
+        self.prompts = []
+        self.closed = False
+
+    def generate(self, system_prompt: str, user_prompt: str) -> str:
+        self.prompts.append(user_prompt)
+        return f"reply {len(self.prompts)}"
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_bucket_numbers_keeps_the_step_precision():
+    assert bucket_numbers("距离约 5.1 米", 0.25) == "距离约 5.00 米"
+    assert bucket_numbers("停留约 6.2 秒", 0.5) == "停留约 6.0 秒"
+    assert bucket_numbers("12.4", 5) == "10"
+    assert bucket_numbers("5.13", 0.0) == "5.13"
+
+
+def test_key_depends_on_model_and_both_prompts():
+    key = cache_key("m", "sys", "user")
+    assert key == cache_key("m", "sys", "user")
+    assert key != cache_key("m2", "sys", "user")
+    assert key != cache_key("m", "sys2", "user")
+    assert key != cache_key("m", "sys", "user2")
+    # Parts are separated, so moving text across the boundary changes the key.
+    assert cache_key("m", "ab", "c") != cache_key("m", "a", "bc")
+
+
+def test_bucketing_shares_replies_but_sends_the_exact_prompt(tmp_path):
+    inner = RecordingClient()
+    client = CachedLLMClient(inner, tmp_path / "cache.sqlite", model_name="m", numeric_bucket=0.5)
+    first = client.complete("sys", "距离约 5.1 米")
+    assert client.complete("sys", "距离约 4.9 米") == first
+    assert inner.prompts == ["距离约 5.1 米"]
+    assert client.stats()["hits"] == 1
+    client.close()
+    assert inner.closed
+
+
+def test_replies_survive_a_restart_and_are_evicted_by_size(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    inner = RecordingClient()
+    client = CachedLLMClient(inner, path, model_name="m", max_bytes=len("reply 1") * 2)
+    for prompt in ("a", "b", "c"):
+        client.complete("sys", prompt)
+    assert client.stats()["entries"] == 2
+    client.close()
+
+    reopened = CachedLLMClient(RecordingClient(), path, model_name="m")
+    assert reopened.complete("sys", "c") == "reply 3"
+    assert reopened.stats()["hits"] == 1
+    reopened.close()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from demo.inference.postprocess import class_name_table, nms, yolov5_postprocess
+
+
+def test_nms_keeps_the_best_of_overlapping_boxes():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [20, 20, 30, 30]], dtype=np.float32)
+    scores = np.array([0.8, 0.9, 0.7], dtype=np.float32)
+    assert nms(boxes, scores, iou_threshold=0.5).tolist() == [1, 2]
+    assert nms(boxes, scores, iou_threshold=0.9).tolist() == [1, 0, 2]
+    assert nms(boxes, scores, iou_threshold=0.5, max_output=1).tolist() == [1]
+
+
+def prediction(cx, cy, w, h, objectness, class_probs):
+    return [cx, cy, w, h, objectness, *class_probs]
+
+
+def test_postprocess_decodes_and_does_not_suppress_across_classes():
+    pred = np.array(
+        [
+            prediction(50, 50, 20, 20, 0.9, [0.9, 0.1]),
+            prediction(51, 51, 20, 20, 0.9, [0.1, 0.8]),  # same place, other class: kept
+            prediction(52, 50, 20, 20, 0.9, [0.7, 0.1]),  # duplicate of the first: suppressed
+            prediction(10, 10, 4, 4, 0.2, [1.0, 0.0]),  # below the confidence threshold
+        ],
+        dtype=np.float32,
+    )
+    boxes, scores, class_ids = yolov5_postprocess(pred, 0.25, 0.45, max_detections=300)
+    assert class_ids.tolist() == [0, 1]
+    assert np.allclose(scores, [0.81, 0.72])
+    assert np.allclose(boxes[0], [40, 40, 60, 60])
+    assert boxes.dtype == np.float32 and class_ids.dtype == np.int64
+
+
+def test_postprocess_with_nothing_above_threshold():
+    boxes, scores, class_ids = yolov5_postprocess(np.zeros((5, 7), dtype=np.float32), 0.25, 0.45, 300)
+    assert boxes.shape == (0, 4) and scores.shape == (0,) and class_ids.shape == (0,)
+
+
+def test_class_name_table_from_dict():
+    assert class_name_table({0: "person", 2: "car"}) == ["person", "1", "car"]
+    assert class_name_table(["a", "b"]) == ["a", "b"]
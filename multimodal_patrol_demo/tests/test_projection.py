@@ -0,0 +1,33 @@
+import numpy as np
+
+from demo.fusion.projection import KittiCalibration, project_to_image
+
+CALIB = """P0: 1 0 0 0 0 1 0 0 0 0 1 0
+P2: 700 0 600 45 0 700 180 -0.3 0 0 1 0.003
+R0_rect: 1 0 0 0 1 0 0 0 1
+Tr_velo_to_cam: 0 -1 0 0 0 0 -1 0 1 0 0 0
+calib_time: 09-Jan-2012 14:00:00
+"""
+
+
+def test_calibration_file_parses_and_projects_forward_points(tmp_path):
+    path = tmp_path / "calib.txt"
+    path.write_text(CALIB, encoding="utf-8")
+    velo_to_image = KittiCalibration.from_file(path).velo_to_image()
+    assert velo_to_image.shape == (3, 4)
+
+    points = np.array(
+        [
+            [10.0, 0.0, 0.0],  # straight ahead
+            [10.0, 1.0, 0.0],  # 1 m to the left
+            [-10.0, 0.0, 0.0],  # behind the camera
+            [10.0, 50.0, 0.0],  # outside the image
+        ],
+        dtype=np.float32,
+    )
+    projected = project_to_image(points, velo_to_image, (375, 1242))
+    assert len(projected.uv) == 2
+    assert np.allclose(projected.uv[0], [(6000 + 45) / 10.003, (1800 - 0.3) / 10.003], atol=1e-3)
+    assert projected.uv[1, 0] < projected.uv[0, 0]
+    assert np.allclose(projected.ranges, [10.0, np.hypot(10.0, 1.0)])
+
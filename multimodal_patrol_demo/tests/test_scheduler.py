@@ -0,0 +1,55 @@
+from demo.scheduler import PlaybackScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def play(policy: str, frame_interval_s: float, work_s: float, frames: int = 100):
+    clock = FakeClock()
+    scheduler = PlaybackScheduler(policy=policy, max_lag_s=0.1, clock=clock, sleep=clock.sleep)
+    shown = []
+    for i in range(frames):
+        clock.now += work_s
+        if scheduler.wait(i * frame_interval_s):
+            shown.append(i)
+    return scheduler, shown, clock
+
+
+def test_realtime_playback_shows_every_frame_on_schedule():
+    scheduler, shown, clock = play("drop", frame_interval_s=0.1, work_s=0.02)
+    assert shown == list(range(100))
+    assert abs(clock.now - (99 * 0.1 + 0.02)) < 1e-6
+
+
+def test_drop_policy_keeps_showing_frames_when_processing_is_slower_than_real_time():
+    scheduler, shown, _ = play("drop", frame_interval_s=0.1, work_s=0.15)
+    assert scheduler.stats()["dropped"] > 0
+    assert len(shown) >= 50
+    assert shown[-1] >= 98
+    # Never two dropped frames in a row.
+    assert all(b - a <= 2 for a, b in zip(shown, shown[1:]))
+
+
+def test_none_policy_never_drops():
+    scheduler, shown, _ = play("none", frame_interval_s=0.1, work_s=0.15)
+    assert shown == list(range(100))
+    assert scheduler.stats()["dropped"] == 0
+
+
+def test_pause_does_not_count_as_lag():
+    clock = FakeClock()
+    scheduler = PlaybackScheduler(policy="drop", max_lag_s=0.1, clock=clock, sleep=clock.sleep)
+    assert scheduler.wait(0.0)
+    scheduler.pause()
+    clock.now += 5.0
+    scheduler.resume()
+    assert scheduler.wait(0.1)
+    assert scheduler.stats()["dropped"] == 0
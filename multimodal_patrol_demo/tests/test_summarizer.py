@@ -0,0 +1,71 @@
+import threading
+import time
+
+from demo.llm.summarizer import NO_EVENTS_SUMMARY, StreamingSummarizer
+from demo.types import AlertEvent
+
+
+class StubReportGenerator:
+    """Summarises windows as "W<n events>" and merges as "M(...)"; window calls can be held back."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+        self.final_calls = []
+
+    def build_event_prompt(self, event: AlertEvent) -> str:
+        return f"event {event.timestamp:.0f}"
+
+    def summarize_window(self, lines):
+        self.started.set()
+        self.release.wait(timeout=5.0)
+        return f"W{len(lines)}"
+
+    def merge_summaries(self, summaries, lines=(), final=False):
+        if final:
+            self.final_calls.append((list(summaries), list(lines)))
+            return "final"
+        return "M(" + ",".join(summaries) + ")"
+
+
+def event(ts: float) -> AlertEvent:
+    return AlertEvent(timestamp=ts, class_name="person", distance_m=5.0, zone_name="zone", duration_s=6.0)
+
+
+def test_windows_are_merged_level_by_level():
+    generator = StubReportGenerator()
+    summarizer = StreamingSummarizer(generator, window_events=2, window_s=0, fanout=2, background=False).start()
+    for ts in range(9):
+        summarizer.add(event(float(ts)))
+    assert summarizer.finish() == "final"
+    summaries, lines = generator.final_calls[0]
+    # Four windows folded into one level-2 summary; the ninth event is still in the open window.
+    assert summaries == ["M(M(W2,W2),M(W2,W2))"]
+    assert lines == ["event 8"]
+    assert summarizer.stats()["merges"] == 3
+
+
+def test_finish_summarises_locally_what_a_stuck_worker_still_holds():
+    generator = StubReportGenerator()
+    generator.release.clear()
+    summarizer = StreamingSummarizer(generator, window_events=2, window_s=0, fanout=4).start()
+    for ts in range(4):
+        summarizer.add(event(float(ts)))
+    assert generator.started.wait(timeout=5.0)
+
+    assert summarizer.finish(call_timeout_s=0.05) == "final"
+    summaries, _ = generator.final_calls[0]
+    # The window being summarised and the one queued behind it both fall back to local summaries.
+    assert len(summaries) == 2 and all("共 2 个告警事件" in s for s in summaries)
+    assert summarizer.stats()["timed_out"] == 2
+
+    # The worker finishing late must not add to an already returned summary.
+    generator.release.set()
+    time.sleep(0.1)
+    assert summarizer.pending_summaries() == []
+
+
+def test_no_events():
+    summarizer = StreamingSummarizer(StubReportGenerator(), background=False).start()
+    assert summarizer.finish() == NO_EVENTS_SUMMARY
@@ -0,0 +1,45 @@
+import numpy as np
+
+from demo.fusion.tracker import MultiObjectTracker, greedy_assignment, iou_matrix
+from demo.types import Target3D
+
+
+def target(x: float, class_name: str = "person", ts: float = 0.0) -> Target3D:
+    return Target3D(
+        class_name=class_name,
+        distance_m=5.0,
+        in_danger_zone=False,
+        bbox_xyxy=np.array([x, 0.0, x + 10.0, 10.0], dtype=np.float32),
+        timestamp=ts,
+    )
+
+
+def test_iou_matrix_and_greedy_assignment():
+    boxes = np.array([[0, 0, 10, 10], [20, 0, 30, 10]], dtype=np.float32)
+    scores = iou_matrix(boxes, boxes[::-1] + [1, 0, 1, 0])
+    assert scores.shape == (2, 2)
+    assert scores[0, 0] == 0.0
+    assert np.isclose(scores[0, 1], 90 / 110)
+    assert sorted(greedy_assignment(scores, 0.3)) == [(0, 1), (1, 0)]
+
+
+def test_moving_target_keeps_its_id_and_classes_do_not_mix():
+    tracker = MultiObjectTracker(iou_threshold=0.3, max_age_s=0.5)
+    first = tracker.update([target(0.0), target(100.0, "car")], timestamp=0.0)
+    ids = [t.track_id for t in first]
+    second = tracker.update([target(100.0), target(2.0, "car"), target(101.0, "car")], timestamp=0.1)
+    assert second[2].track_id == ids[1]
+    assert second[0].track_id not in ids
+    assert second[1].track_id not in ids
+
+
+def test_tracks_expire_after_max_age_in_seconds_not_frames():
+    tracker = MultiObjectTracker(iou_threshold=0.3, max_age_s=0.5)
+    track_id = tracker.update([target(0.0)], timestamp=0.0)[0].track_id
+    # Many frames at a high rate but within 0.5 s: the track survives.
+    for i in range(1, 40):
+        tracker.update([], timestamp=i * 0.01)
+    assert tracker.update([target(1.0, ts=0.45)], timestamp=0.45)[0].track_id == track_id
+    # Two frames at a low rate spanning more than 0.5 s: it is dropped.
+    tracker.update([], timestamp=1.0)
+    assert tracker.active_track_ids == []
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from demo.config import ZoneConfig
+from demo.fusion.zone_mask import ZoneMask
+
+LEFT = ZoneConfig(name="left", polygon=[[0.0, 0.0], [0.5, 0.0], [0.5, 1.0], [0.0, 1.0]])
+# Overlaps the right half of LEFT.
+MIDDLE = ZoneConfig(name="middle", polygon=[[0.25, 0.0], [0.75, 0.0], [0.75, 1.0], [0.25, 1.0]])
+TRIANGLE = ZoneConfig(name="triangle", polygon=[[0.0, 1.0], [1.0, 1.0], [1.0, 0.0]])
+
+
+def test_overlapping_zones_get_separate_bits():
+    mask = ZoneMask([LEFT, MIDDLE]).mask_for((10, 20))
+    assert mask.shape == (10, 20)
+    assert mask[5, 1] == 0b01
+    assert mask[5, 8] == 0b11
+    assert mask[5, 13] == 0b10
+    assert mask[5, 18] == 0
+
+
+def test_polygon_rasterisation_follows_the_diagonal():
+    mask = ZoneMask([TRIANGLE]).mask_for((100, 100))
+    assert mask[95, 95] == 1
+    assert mask[5, 5] == 0
+    # Roughly half the image, whatever the rasterisation rule for edge pixels.
+    assert 0.45 < mask.astype(bool).mean() < 0.56
+
+
+def test_center_and_footprint_membership():
+    zones = ZoneMask([LEFT, MIDDLE])
+    boxes = np.array(
+        [
+            [2, 2, 6, 8],  # centre and feet in LEFT only
+            [6, 0, 12, 10],  # centre in both; feet straddle both
+            [14, 0, 19, 10],  # MIDDLE only partly, at the left edge of the box
+        ],
+        dtype=np.float32,
+    )
+    center = zones.membership(boxes, (10, 20), mode="center")
+    assert center.tolist() == [[True, False], [True, True], [False, False]]
+    footprint = zones.membership(boxes, (10, 20), mode="footprint", min_overlap=0.5)
+    assert footprint[0].tolist() == [True, False]
+    assert footprint[1].tolist() == [True, True]
+    assert footprint[2].tolist() == [False, False]
+
+
+def test_no_boxes_and_bad_mode():
+    zones = ZoneMask([LEFT])
+    assert zones.membership(np.zeros((0, 4)), (10, 20)).shape == (0, 1)
+    with pytest.raises(ValueError):
+        zones.membership(np.array([[0, 0, 1, 1]]), (10, 20), mode="corners")